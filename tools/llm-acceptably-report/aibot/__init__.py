@@ -7,9 +7,9 @@ A professional tool for analyzing web server logs to detect and report on AI bot
 __version__ = "2.0.0"
 __author__ = "AI Bot Analyzer Team"
 
-from .config import Config, BotPattern, get_config
+from .config import Config, BotPattern, get_config, match_bot_ip
 from .parsers import LogParser, LogEntry
-from .detectors import BotDetector, BotInfo
+from .detectors import BotDetector, BotInfo, get_bot_detector
 from .insights import InsightsEngine
 from .analyzer import AIBotAnalyzer
 
@@ -17,10 +17,12 @@ __all__ = [
     'Config',
     'BotPattern',
     'get_config',
+    'match_bot_ip',
     'LogParser',
     'LogEntry',
     'BotDetector',
     'BotInfo',
+    'get_bot_detector',
     'InsightsEngine',
     'AIBotAnalyzer',
 ]
@@ -5,17 +5,241 @@ Core analysis engine for processing web server logs and generating reports.
 """
 
 from collections import defaultdict, Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Any
-from urllib.parse import urlparse, parse_qs
+from typing import Dict, List, Optional, Callable, Any, Tuple
+from urllib.parse import urlparse, unquote
+import mmap
+import os
 import re
 
 from .config import get_config, Config
 from .parsers import LogParser
-from .detectors import BotDetector
+from .detectors import BotDetector, get_bot_detector
 from .insights import InsightsEngine
 
 
+# Indexed by datetime.weekday(); avoids a strftime('%A') call per line
+_WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Status code -> report group ('2xx'..'5xx', None otherwise), precomputed so
+# status_codes can be bucketed in bulk without a chain of range checks
+_STATUS_GROUPS = tuple(
+    f'{code // 100}xx' if 200 <= code < 600 else None for code in range(600)
+)
+
+
+def _describe_failure(status_code: int) -> str:
+    """Describe a failure status code (see _FAILURE_CATEGORIES)."""
+    if 300 <= status_code < 400:
+        return "Redirect"
+    elif status_code == 404:
+        return "404 Not Found"
+    elif status_code == 500:
+        return "500 Server Error"
+    elif status_code == 503:
+        return "503 Service Unavailable"
+    elif 400 <= status_code < 500:
+        return f"{status_code} Client Error"
+    elif 500 <= status_code < 600:
+        return f"{status_code} Server Error"
+    return f"Unknown ({status_code})"
+
+
+# Precomputed failure category per status code, so failures are categorized
+# by index and share one string object per category
+_FAILURE_CATEGORIES = tuple(_describe_failure(code) for code in range(600))
+
+# Columns of failure_details, stored as parallel lists (one entry per failure)
+_FAILURE_COLUMNS = ('timestamp', 'url', 'status', 'bot_type', 'failure_type', 'method')
+
+# Bot version patterns in priority order, each with one capturing group
+_BOT_VERSION_PATTERNS = (
+    r'GPTBot/(\d+\.?\d*)',
+    r'ClaudeBot/(\d+\.?\d*)',
+    r'Googlebot/(\d+\.?\d*)',
+    r'bingbot/(\d+\.?\d*)',
+    r'PerplexityBot/(\d+\.?\d*)',
+    r'anthropic-ai/(\d+\.?\d*)',
+    r'/(\d+\.\d+)',  # Generic version pattern
+)
+_BOT_VERSION_RE = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in _BOT_VERSION_PATTERNS), re.IGNORECASE
+)
+
+# URL file extension -> content type bucket
+_EXTENSION_CONTENT_TYPES = {
+    'html': 'HTML', 'htm': 'HTML',
+    'css': 'CSS',
+    'js': 'JavaScript',
+    'jpg': 'Images', 'jpeg': 'Images', 'png': 'Images', 'gif': 'Images',
+    'webp': 'Images', 'svg': 'Images', 'ico': 'Images',
+    'json': 'JSON/API',
+    'xml': 'XML/Feeds', 'rss': 'XML/Feeds', 'atom': 'XML/Feeds',
+    'pdf': 'Documents', 'doc': 'Documents', 'docx': 'Documents',
+}
+
+
+def _pivot(pair_counts: Counter) -> Dict[Any, Counter]:
+    """Pivot a Counter keyed by (outer, inner) into {outer: Counter(inner)}."""
+    nested: Dict[Any, Counter] = {}
+    for (outer, inner), count in pair_counts.items():
+        inner_counts = nested.get(outer)
+        if inner_counts is None:
+            inner_counts = nested[outer] = Counter()
+        inner_counts[inner] = count
+    return nested
+
+
+# Per-line helpers below see the same referrers, URLs and user agents over
+# and over, so the ones called from the hot loop are memoized. The caches
+# are process-global, so they are kept small and cleared after each run
+# (see _clear_helper_caches).
+_HELPER_CACHE_SIZE = 4096
+
+_SEARCH_ENGINE_RE = re.compile(r'google|bing|yahoo|duckduckgo|baidu|yandex')
+
+# Well-known first path segments reported as their own section
+_COMMON_SECTIONS = frozenset({
+    'blog', 'products', 'services', 'about', 'contact', 'news', 'articles',
+    'category', 'categories', 'tag', 'tags', 'shop', 'store', 'docs',
+    'documentation', 'api', 'help', 'support', 'faq', 'pricing',
+})
+
+# First path segments of asset directories, grouped as '/assets/'
+_ASSET_SECTIONS = frozenset({
+    'wp-content', 'static', 'assets', 'images', 'img', 'css', 'js', 'fonts', 'media',
+})
+
+# Optional scheme followed by '//' and the netloc, as urlparse splits it
+_NETLOC_RE = re.compile(r'(?:[A-Za-z][A-Za-z0-9+.-]*:)?//([^/?#]*)')
+
+
+def _categorize_content_type(url: str) -> str:
+    """Categorize a URL by its file extension."""
+    path = url.partition('?')[0]
+    if path.endswith('/'):
+        return 'HTML'
+
+    _, dot, extension = path.rpartition('.')
+    if not dot:
+        return 'Other'
+    return _EXTENSION_CONTENT_TYPES.get(extension.lower(), 'Other')
+
+
+@lru_cache(maxsize=_HELPER_CACHE_SIZE)
+def _categorize_referrer(referrer: str) -> str:
+    """Categorize referrer as direct, search, or external."""
+    if not referrer or referrer == '-' or referrer == '':
+        return 'direct'
+
+    if _SEARCH_ENGINE_RE.search(referrer.lower()):
+        return 'search'
+
+    return 'external'
+
+
+@lru_cache(maxsize=_HELPER_CACHE_SIZE)
+def _extract_domain(url: str) -> Optional[str]:
+    """Extract domain from URL."""
+    # Plain printable ASCII URLs are sliced directly; anything urlparse would
+    # normalize or validate (leading spaces, control characters, IPv6
+    # brackets, non-ASCII hosts) still goes through it
+    if url.isascii() and url.isprintable() and url[:1] != ' ' and '[' not in url and ']' not in url:
+        match = _NETLOC_RE.match(url)
+        return (match.group(1) or None) if match else None
+
+    try:
+        parsed = urlparse(url)
+        return parsed.netloc if parsed.netloc else None
+    except Exception:
+        return None
+
+
+def _parse_path(url: str) -> Tuple[str, int]:
+    """Return the site section and crawl depth of a URL from one path split."""
+    parts = [p for p in url.partition('?')[0].split('/') if p]
+    if not parts:
+        return 'homepage', 0
+
+    depth = min(len(parts), 5)  # Cap at 5 for grouping
+    first_part = parts[0].lower()
+    if first_part in _COMMON_SECTIONS:
+        return f'/{first_part}/', depth
+
+    # Check for asset directories
+    if first_part in _ASSET_SECTIONS:
+        return '/assets/', depth
+
+    return f'/{first_part}/', depth
+
+
+@lru_cache(maxsize=_HELPER_CACHE_SIZE)
+def _classify_url(url: str) -> Tuple[str, str, int, bool, bool]:
+    """
+    Derive everything the analyzer needs from a URL alone, memoized so a
+    repeated URL costs one lookup.
+
+    Returns:
+        Tuple of (content type, section, crawl depth, is robots.txt,
+        is XML sitemap)
+    """
+    url_lower = url.lower()
+    section, depth = _parse_path(url)
+    return (
+        _categorize_content_type(url),
+        section,
+        depth,
+        'robots.txt' in url_lower,
+        'sitemap' in url_lower and url_lower.endswith('.xml'),
+    )
+
+
+@lru_cache(maxsize=_HELPER_CACHE_SIZE)
+def _extract_params(url: str) -> Tuple[str, ...]:
+    """Extract query parameter names from URL (as parse_qs would key them)."""
+    query = url.partition('?')[2]
+    if not query:
+        return ()
+
+    names: Dict[str, None] = {}  # Ordered set, first occurrence wins
+    for field in query.split('&'):
+        name, _, value = field.partition('=')
+        if not value:
+            continue  # parse_qs drops fields without a value
+        if '%' in name or '+' in name:
+            name = unquote(name.replace('+', ' '))
+        names[name] = None
+    return tuple(names)
+
+
+@lru_cache(maxsize=_HELPER_CACHE_SIZE)
+def _extract_bot_version(user_agent: str) -> str:
+    """Extract bot version from user agent string."""
+    if not user_agent or '/' not in user_agent:
+        return 'unknown'  # Every version pattern needs a '/'
+
+    # The earliest pattern in _BOT_VERSION_PATTERNS wins, wherever it
+    # matches in the string; group N belongs to pattern N
+    best = None
+    for match in _BOT_VERSION_RE.finditer(user_agent):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:
+                break
+
+    return best.group(best.lastindex) if best else 'unknown'
+
+
+def _clear_helper_caches():
+    """Drop the memoized per-line helper results of a finished run."""
+    for helper in (_categorize_referrer, _extract_domain, _classify_url,
+                   _extract_params, _extract_bot_version):
+        helper.cache_clear()
+
+
 class AIBotAnalyzer:
     """
     Main analyzer class for processing web server logs.
@@ -23,11 +247,38 @@ class AIBotAnalyzer:
     Identifies AI bot traffic and generates comprehensive reports.
     """
 
+    # Files are split across worker processes only when each worker gets at
+    # least this many bytes; smaller logs are analyzed in-process.
+    PARALLEL_MIN_CHUNK_BYTES = 16 * 1024 * 1024
+
+    # Bot requests buffered per column before being counted in bulk
+    COLUMN_BATCH_SIZE = 8192
+
+    # Accumulators grouped by how partial results from workers are merged
+    _SUM_FIELDS = (
+        'total_requests', 'total_all_requests', 'human_requests',
+        'total_bytes', 'indexable_pages', 'non_indexable_pages',
+    )
+    _COUNTER_FIELDS = (
+        'bot_requests', 'bot_successes', 'url_requests', 'url_failures',
+        'status_codes', 'hourly_traffic', 'daily_traffic', 'hourly_by_bot',
+        'bot_bytes', 'request_methods', 'content_types',
+        'referrer_sources', 'referrer_domains', 'section_hits', 'crawl_depth',
+        'robots_txt_accesses', 'sitemap_accesses', 'url_params', 'param_urls',
+        'daily_request_counts', 'ip_countries',
+        # Flat counters keyed by (bot_type or url, value); see _pivot()
+        'bot_status_codes', 'bot_url_preferences', 'url_failure_types',
+        'bot_failure_types', 'bot_referrer_sources', 'bot_section_preferences',
+        'bot_versions',
+    )
+
     def __init__(self, config: Optional[Config] = None):
         """Initialize analyzer with configuration."""
         self.config = config or get_config()
         self.parser = LogParser()
-        self.detector = BotDetector(self.config)
+        # Analyzers on the global config share one detector, so its identify()
+        # cache stays warm across runs (e.g. successive uploads in the web app)
+        self.detector = get_bot_detector() if config is None else BotDetector(self.config)
         self.insights = InsightsEngine(self.config)
         self.reset()
 
@@ -36,37 +287,36 @@ class AIBotAnalyzer:
         self.total_requests = 0
         self.total_all_requests = 0  # All requests including human
         self.human_requests = 0  # Non-bot requests
-        self.bot_requests: Dict[str, int] = defaultdict(int)
+        self.bot_requests: Counter = Counter()
         self.bot_successes: Dict[str, int] = defaultdict(int)
         self.url_requests: Counter = Counter()
         self.url_failures: Counter = Counter()
         self.status_codes: Counter = Counter()
-        self.bot_status_codes: Dict[str, Counter] = defaultdict(Counter)
+        self.bot_status_codes: Counter = Counter()  # (bot_type, status) -> count
         self.date_range: Dict[str, Any] = {'min': None, 'max': None}
-        self.hourly_traffic: Dict[int, int] = defaultdict(int)
-        self.daily_traffic: Dict[str, int] = defaultdict(int)
-        self.hourly_by_bot: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.hourly_traffic: Counter = Counter()
+        self.daily_traffic: Counter = Counter()
+        self.hourly_by_bot: Counter = Counter()  # (bot_type, hour) -> count
         self.bot_sessions: Dict[str, List] = defaultdict(list)
-        self.bot_url_preferences: Dict[str, Counter] = defaultdict(Counter)
-        self.failure_details: List[Dict] = []
-        self.url_failure_types: Dict[str, Counter] = defaultdict(Counter)
-        self.bot_failure_types: Dict[str, Counter] = defaultdict(Counter)
+        self.bot_url_preferences: Counter = Counter()  # (bot_type, url) -> count
+        self.failure_details: Dict[str, List] = {column: [] for column in _FAILURE_COLUMNS}
+        self.url_failure_types: Counter = Counter()  # (url, failure_type) -> count
+        self.bot_failure_types: Counter = Counter()  # (bot_type, failure_type) -> count
         # New metrics
         self.total_bytes: int = 0  # Bandwidth tracking
         self.bot_bytes: Dict[str, int] = defaultdict(int)
         self.request_methods: Counter = Counter()  # GET, POST, HEAD, etc.
         self.content_types: Counter = Counter()  # HTML, images, CSS, JS
-        self.status_code_groups: Dict[str, int] = {'2xx': 0, '3xx': 0, '4xx': 0, '5xx': 0}
 
         # NEW: Referrer tracking
         self.referrer_sources: Counter = Counter()  # direct/search/external
         self.referrer_domains: Counter = Counter()
-        self.bot_referrer_sources: Dict[str, Counter] = defaultdict(Counter)
+        self.bot_referrer_sources: Counter = Counter()  # (bot_type, source) -> count
 
         # NEW: Site structure
         self.section_hits: Counter = Counter()  # /blog/, /products/
         self.crawl_depth: Counter = Counter()  # 0, 1, 2, 3+
-        self.bot_section_preferences: Dict[str, Counter] = defaultdict(Counter)
+        self.bot_section_preferences: Counter = Counter()  # (bot_type, section) -> count
 
         # NEW: Compliance tracking
         self.robots_txt_accesses: Dict[str, int] = defaultdict(int)
@@ -77,10 +327,10 @@ class AIBotAnalyzer:
         self.param_urls: Counter = Counter()
 
         # NEW: Bot versions
-        self.bot_versions: Dict[str, Counter] = defaultdict(Counter)
+        self.bot_versions: Counter = Counter()  # (bot_type, version) -> count
 
         # NEW: Anomaly detection
-        self.daily_request_counts: Dict[str, int] = defaultdict(int)
+        self.daily_request_counts: Counter = Counter()
 
         # NEW: SEO metrics
         self.indexable_pages: int = 0
@@ -93,7 +343,8 @@ class AIBotAnalyzer:
         self,
         log_file: str,
         ignore_homepage_redirects: bool = True,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Analyze a log file for AI bot traffic.
@@ -101,7 +352,10 @@ class AIBotAnalyzer:
         Args:
             log_file: Path to the log file
             ignore_homepage_redirects: Treat homepage redirects as success
-            progress_callback: Optional callback for progress updates
+            progress_callback: Optional callback receiving (parsed lines,
+                AI bot requests) as analysis progresses
+            workers: Number of worker processes (default: based on file
+                size and CPU count; 1 forces in-process analysis)
 
         Returns:
             Analysis report as dictionary
@@ -115,170 +369,33 @@ class AIBotAnalyzer:
         # Track sessions by IP
         ip_sessions: Dict[str, List] = defaultdict(list)
 
-        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-            for line_num, line in enumerate(f, 1):
-                parsed = self.parser.parse(line.strip())
-                if not parsed:
-                    continue
-
-                # Count ALL requests for human vs bot ratio
-                self.total_all_requests += 1
-
-                # Check if it's a bot
-                bot_type = self.detector.identify(parsed['user_agent'])
-                if not bot_type:
-                    self.human_requests += 1
-                    continue
-
-                # Update date range
-                ts = parsed['timestamp']
-                if self.date_range['min'] is None or ts < self.date_range['min']:
-                    self.date_range['min'] = ts
-                if self.date_range['max'] is None or ts > self.date_range['max']:
-                    self.date_range['max'] = ts
-
-                # Time patterns
-                hour_key = ts.hour
-                day_key = ts.strftime('%A')
-
-                self.hourly_traffic[hour_key] += 1
-                self.daily_traffic[day_key] += 1
-                self.hourly_by_bot[bot_type][hour_key] += 1
-
-                # Session tracking
-                ip_sessions[parsed['ip']].append({
-                    'timestamp': ts,
-                    'url': parsed['url'],
-                    'bot_type': bot_type,
-                    'status': parsed['status']
-                })
-                self.bot_url_preferences[bot_type][parsed['url']] += 1
-
-                # Count requests
-                self.total_requests += 1
-                self.bot_requests[bot_type] += 1
-                self.url_requests[parsed['url']] += 1
-                self.status_codes[parsed['status']] += 1
-                self.bot_status_codes[bot_type][parsed['status']] += 1
-
-                # Track status code groups
-                status = parsed['status']
-                if 200 <= status < 300:
-                    self.status_code_groups['2xx'] += 1
-                elif 300 <= status < 400:
-                    self.status_code_groups['3xx'] += 1
-                elif 400 <= status < 500:
-                    self.status_code_groups['4xx'] += 1
-                elif 500 <= status < 600:
-                    self.status_code_groups['5xx'] += 1
-
-                # Track request methods
-                self.request_methods[parsed['method']] += 1
-
-                # Track bandwidth (if available in parsed data)
-                if 'bytes' in parsed and parsed['bytes']:
-                    try:
-                        bytes_sent = int(parsed['bytes']) if parsed['bytes'] != '-' else 0
-                        self.total_bytes += bytes_sent
-                        self.bot_bytes[bot_type] += bytes_sent
-                    except (ValueError, TypeError):
-                        pass
-
-                # Track content types based on URL extension
-                url = parsed['url'].split('?')[0].lower()
-                if url.endswith(('.html', '.htm', '/')):
-                    self.content_types['HTML'] += 1
-                elif url.endswith(('.css',)):
-                    self.content_types['CSS'] += 1
-                elif url.endswith(('.js',)):
-                    self.content_types['JavaScript'] += 1
-                elif url.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico')):
-                    self.content_types['Images'] += 1
-                elif url.endswith(('.json',)):
-                    self.content_types['JSON/API'] += 1
-                elif url.endswith(('.xml', '.rss', '.atom')):
-                    self.content_types['XML/Feeds'] += 1
-                elif url.endswith(('.pdf', '.doc', '.docx')):
-                    self.content_types['Documents'] += 1
-                else:
-                    self.content_types['Other'] += 1
-
-                # NEW: Referrer analysis
-                referrer = parsed.get('referrer', '-')
-                ref_category = self._categorize_referrer(referrer)
-                self.referrer_sources[ref_category] += 1
-                self.bot_referrer_sources[bot_type][ref_category] += 1
-                if ref_category == 'external':
-                    ref_domain = self._extract_domain(referrer)
-                    if ref_domain:
-                        self.referrer_domains[ref_domain] += 1
-
-                # NEW: Site structure analysis
-                section = self._extract_section(parsed['url'])
-                self.section_hits[section] += 1
-                self.bot_section_preferences[bot_type][section] += 1
-                depth = self._calculate_depth(parsed['url'])
-                self.crawl_depth[depth] += 1
-
-                # NEW: Compliance tracking (robots.txt & sitemap)
-                url_path = parsed['url'].lower()
-                if 'robots.txt' in url_path:
-                    self.robots_txt_accesses[bot_type] += 1
-                if 'sitemap' in url_path and url_path.endswith('.xml'):
-                    self.sitemap_accesses[bot_type] += 1
-
-                # NEW: Query parameter tracking
-                if '?' in parsed['url']:
-                    params = self._extract_params(parsed['url'])
-                    for param in params:
-                        self.url_params[param] += 1
-                    self.param_urls[parsed['url'].split('?')[0]] += 1
-
-                # NEW: Bot version tracking
-                version = self._extract_bot_version(parsed['user_agent'])
-                self.bot_versions[bot_type][version] += 1
-
-                # NEW: Daily counts for anomaly detection
-                day_str = ts.strftime('%Y-%m-%d')
-                self.daily_request_counts[day_str] += 1
-
-                # NEW: SEO indexability
-                if 200 <= parsed['status'] < 300:
-                    self.indexable_pages += 1
-                else:
-                    self.non_indexable_pages += 1
-
-                # Determine success
-                is_success = self._is_success(parsed['status'])
-
-                # Optionally treat homepage redirects as success
-                if ignore_homepage_redirects and parsed['url'] == '/' and 300 <= parsed['status'] < 400:
-                    is_success = True
-
-                if is_success:
-                    self.bot_successes[bot_type] += 1
-                else:
-                    self.url_failures[parsed['url']] += 1
-                    failure_type = self._categorize_failure(parsed['status'])
-                    self.failure_details.append({
-                        'timestamp': ts,
-                        'url': parsed['url'],
-                        'status': parsed['status'],
-                        'bot_type': bot_type,
-                        'failure_type': failure_type,
-                        'method': parsed['method']
-                    })
-                    self.url_failure_types[parsed['url']][failure_type] += 1
-                    self.bot_failure_types[bot_type][failure_type] += 1
-
-                # Progress callback
-                if progress_callback and line_num % 1000 == 0:
-                    progress_callback(line_num, self.total_requests)
-
-        # Build sessions from IP tracking
+        chunks = self._plan_chunks(log_path, workers)
+        if len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [
+                    pool.submit(_analyze_chunk, self.config, str(log_path), start, end,
+                                ignore_homepage_redirects)
+                    for start, end in chunks
+                ]
+                # Merge in file order so results match a sequential pass
+                for future in futures:
+                    state, chunk_sessions = future.result()
+                    self._merge_state(state)
+                    for ip, requests in chunk_sessions.items():
+                        ip_sessions[ip].extend(requests)
+                    if progress_callback:
+                        progress_callback(self.total_all_requests, self.total_requests)
+        else:
+            start, end = chunks[0]
+            self._analyze_range(log_file, start, end, ignore_homepage_redirects,
+                                ip_sessions, progress_callback)
+
+        # Build sessions from IP tracking. Logs are normally chronological, and
+        # timsort finishes already-ordered lists in a single linear pass.
+        by_timestamp = itemgetter('timestamp')
         for ip, requests in ip_sessions.items():
             if len(requests) > 1:
-                requests.sort(key=lambda x: x['timestamp'])
+                requests.sort(key=by_timestamp)
                 bot_type = requests[0]['bot_type']
                 self.bot_sessions[bot_type].append(requests)
 
@@ -286,6 +403,357 @@ class AIBotAnalyzer:
 
         return self.generate_report()
 
+    def _analyze_range(
+        self,
+        log_file: str,
+        start: int,
+        end: int,
+        ignore_homepage_redirects: bool,
+        ip_sessions: Dict[str, List],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        """Memory-map a log file and analyze the lines in a byte range."""
+        if end <= start:
+            return  # Nothing to read (mmap also rejects empty files)
+
+        with open(log_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # The scan is strictly front-to-back; let the kernel read ahead
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                entries = self.parser.parse_buffer(mm, start, end)
+                try:
+                    self._process_entries(entries, ignore_homepage_redirects, ip_sessions, progress_callback)
+                finally:
+                    # Don't keep this run's URLs and referrers alive in a
+                    # long-lived process such as the web app
+                    _clear_helper_caches()
+
+    def _process_entries(
+        self,
+        entries,
+        ignore_homepage_redirects: bool,
+        ip_sessions: Dict[str, List],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        """Accumulate statistics for an iterable of parsed log entries."""
+        # Bind hot accumulators and helpers to locals for the loop below
+        # (identify() is LRU-cached by the detector)
+        identify = self.detector.identify
+        # The parser always provides every field (referrer is '-' for
+        # common-format lines), so bot requests unpack them in one call
+        bot_request_fields = itemgetter('timestamp', 'ip', 'url', 'status', 'method', 'size', 'referrer')
+        date_range = self.date_range
+        hourly_traffic = self.hourly_traffic
+        daily_traffic = self.daily_traffic
+        hourly_by_bot = self.hourly_by_bot
+        bot_url_preferences = self.bot_url_preferences
+        bot_requests = self.bot_requests
+        url_requests = self.url_requests
+        status_codes = self.status_codes
+        bot_status_codes = self.bot_status_codes
+        request_methods = self.request_methods
+        bot_bytes = self.bot_bytes
+        content_types = self.content_types
+        referrer_sources = self.referrer_sources
+        referrer_domains = self.referrer_domains
+        bot_referrer_sources = self.bot_referrer_sources
+        section_hits = self.section_hits
+        crawl_depth = self.crawl_depth
+        bot_section_preferences = self.bot_section_preferences
+        robots_txt_accesses = self.robots_txt_accesses
+        sitemap_accesses = self.sitemap_accesses
+        url_params = self.url_params
+        param_urls = self.param_urls
+        bot_versions = self.bot_versions
+        daily_request_counts = self.daily_request_counts
+        bot_successes = self.bot_successes
+        url_failures = self.url_failures
+        append_failure_timestamp = self.failure_details['timestamp'].append
+        append_failure_url = self.failure_details['url'].append
+        append_failure_status = self.failure_details['status'].append
+        append_failure_bot_type = self.failure_details['bot_type'].append
+        append_failure_type = self.failure_details['failure_type'].append
+        append_failure_method = self.failure_details['method'].append
+        url_failure_types = self.url_failure_types
+        bot_failure_types = self.bot_failure_types
+        classify_url = _classify_url
+        categorize_referrer = _categorize_referrer
+        extract_domain = _extract_domain
+        extract_params = _extract_params
+        extract_bot_version = _extract_bot_version
+        categorize_failure = self._categorize_failure
+
+        # Plain per-request keys are buffered in columns and counted in bulk
+        # with Counter.update(), which runs the counting loop in C
+        bot_column: List[str] = []
+        url_column: List[str] = []
+        status_column: List[int] = []
+        method_column: List[str] = []
+        hour_column: List[int] = []
+        weekday_column: List[str] = []
+        day_column: List[str] = []
+        content_type_column: List[str] = []
+        referrer_column: List[str] = []
+        section_column: List[str] = []
+        depth_column: List[int] = []
+        version_column: List[str] = []
+        size_column: List[int] = []
+        batch_size = self.COLUMN_BATCH_SIZE
+        column_counters = (
+            (bot_requests, bot_column),
+            (url_requests, url_column),
+            (status_codes, status_column),
+            (request_methods, method_column),
+            (hourly_traffic, hour_column),
+            (daily_traffic, weekday_column),
+            (daily_request_counts, day_column),
+            (content_types, content_type_column),
+            (referrer_sources, referrer_column),
+            (section_hits, section_column),
+            (crawl_depth, depth_column),
+        )
+
+        # Per-bot breakdowns are counted from (bot_type, value) pairs; a
+        # column that is switched off stays empty, so its zip() is too
+        bot_pair_counters = (
+            (hourly_by_bot, hour_column),
+            (bot_url_preferences, url_column),
+            (bot_status_codes, status_column),
+            (bot_referrer_sources, referrer_column),
+            (bot_section_preferences, section_column),
+            (bot_versions, version_column),
+        )
+        columns = (
+            bot_column, url_column, status_column, method_column, hour_column,
+            weekday_column, day_column, content_type_column, referrer_column,
+            section_column, depth_column, version_column, size_column,
+        )
+
+        def flush_columns():
+            for counter, column in bot_pair_counters:
+                counter.update(zip(bot_column, column))
+            for counter, column in column_counters:
+                counter.update(column)
+            self.total_bytes += sum(size_column)
+            for column in columns:
+                column.clear()
+
+        # Optional metrics switched off in config.features are not
+        # accumulated at all (their report sections come out empty)
+        features = self.config.features
+        track_referrers = features.enable_referrer_analysis
+        track_sections = features.enable_site_structure or features.enable_competitive_analysis
+        track_compliance = features.enable_compliance_tracking
+        track_query_params = features.enable_query_params
+        track_daily_counts = features.enable_anomaly_detection
+        track_versions = features.enable_bot_versions
+
+        # Scalar totals are kept in locals and stored back after the loop
+        total_all_requests = self.total_all_requests
+        human_requests = self.human_requests
+        total_requests = self.total_requests
+        indexable_pages = self.indexable_pages
+        non_indexable_pages = self.non_indexable_pages
+
+        last_ordinal = None
+        day_key = day_str = None
+        min_ts = date_range['min']
+        max_ts = date_range['max']
+
+        for entry_num, parsed in enumerate(entries, 1):
+            # Count ALL requests for human vs bot ratio
+            total_all_requests += 1
+
+            # Check if it's a bot
+            user_agent = parsed['user_agent']
+            bot_type = identify(user_agent)
+            if not bot_type:
+                human_requests += 1
+                continue
+
+            ts, ip, url, status, method, bytes_sent, referrer = bot_request_fields(parsed)
+
+            # Update date range (a chronological log only ever moves max)
+            if min_ts is None:
+                min_ts = max_ts = ts
+            elif ts > max_ts:
+                max_ts = ts
+            elif ts < min_ts:
+                min_ts = ts
+
+            # Time patterns. Logs are (nearly) chronological, so the day
+            # labels are only rebuilt when the calendar day changes
+            ordinal = ts.toordinal()
+            if ordinal != last_ordinal:
+                last_ordinal = ordinal
+                day_key = _WEEKDAYS[ts.weekday()]
+                day_str = ts.strftime('%Y-%m-%d')
+
+            hour_column.append(ts.hour)
+            weekday_column.append(day_key)
+
+            # Session tracking
+            ip_sessions[ip].append({
+                'timestamp': ts,
+                'url': url,
+                'bot_type': bot_type,
+                'status': status
+            })
+
+            # Count requests
+            total_requests += 1
+            bot_column.append(bot_type)
+            url_column.append(url)
+            status_column.append(status)
+
+            # Status code groups are derived from status_codes in generate_report()
+            is_2xx = 200 <= status < 300
+
+            # Track request methods
+            method_column.append(method)
+
+            # Track bandwidth (the parser always provides size as an int,
+            # 0 when the log has '-')
+            size_column.append(bytes_sent)
+            bot_bytes[bot_type] += bytes_sent
+
+            # Content type, section, depth and robots/sitemap flags all
+            # depend only on the URL
+            content_type, section, depth, is_robots_txt, is_sitemap = classify_url(url)
+
+            # Track content types based on URL extension
+            content_type_column.append(content_type)
+
+            # NEW: Referrer analysis
+            if track_referrers:
+                ref_category = categorize_referrer(referrer)
+                referrer_column.append(ref_category)
+                if ref_category == 'external':
+                    ref_domain = extract_domain(referrer)
+                    if ref_domain:
+                        referrer_domains[ref_domain] += 1
+
+            # NEW: Site structure analysis
+            if track_sections:
+                section_column.append(section)
+                depth_column.append(depth)
+
+            # NEW: Compliance tracking (robots.txt & sitemap)
+            if track_compliance:
+                if is_robots_txt:
+                    robots_txt_accesses[bot_type] += 1
+                if is_sitemap:
+                    sitemap_accesses[bot_type] += 1
+
+            # NEW: Query parameter tracking
+            if track_query_params and '?' in url:
+                url_params.update(extract_params(url))
+                param_urls[url.partition('?')[0]] += 1
+
+            # NEW: Bot version tracking
+            if track_versions:
+                version_column.append(extract_bot_version(user_agent))
+
+            # NEW: Daily counts for anomaly detection
+            if track_daily_counts:
+                day_column.append(day_str)
+
+            # NEW: SEO indexability
+            if is_2xx:
+                indexable_pages += 1
+            else:
+                non_indexable_pages += 1
+
+            # Determine success, optionally treating homepage redirects as
+            # success (only non-2xx lines reach the redirect check)
+            is_success = is_2xx or (
+                ignore_homepage_redirects and 300 <= status < 400 and url == '/'
+            )
+
+            if is_success:
+                bot_successes[bot_type] += 1
+            else:
+                url_failures[url] += 1
+                failure_type = categorize_failure(status)
+                append_failure_timestamp(ts)
+                append_failure_url(url)
+                append_failure_status(status)
+                append_failure_bot_type(bot_type)
+                append_failure_type(failure_type)
+                append_failure_method(method)
+                url_failure_types[(url, failure_type)] += 1
+                bot_failure_types[(bot_type, failure_type)] += 1
+
+            if len(bot_column) >= batch_size:
+                flush_columns()
+
+            # Progress callback
+            if progress_callback and entry_num % 1000 == 0:
+                progress_callback(entry_num, total_requests)
+
+        flush_columns()
+        self.total_all_requests = total_all_requests
+        self.human_requests = human_requests
+        self.total_requests = total_requests
+        self.indexable_pages = indexable_pages
+        self.non_indexable_pages = non_indexable_pages
+        date_range['min'] = min_ts
+        date_range['max'] = max_ts
+
+    def _plan_chunks(self, log_path: Path, workers: Optional[int]) -> List[Tuple[int, int]]:
+        """Split a log file into line-aligned byte ranges, one per worker."""
+        size = log_path.stat().st_size
+        if workers is None:
+            workers = min(os.cpu_count() or 1, size // self.PARALLEL_MIN_CHUNK_BYTES)
+        if workers <= 1:
+            return [(0, size)]
+
+        boundaries = [0]
+        with open(log_path, 'rb') as f:
+            for i in range(1, workers):
+                f.seek(max(size * i // workers, boundaries[-1]))
+                f.readline()  # Advance to the start of the next line
+                pos = f.tell()
+                if pos >= size:
+                    break
+                if pos > boundaries[-1]:
+                    boundaries.append(pos)
+        boundaries.append(size)
+
+        return list(zip(boundaries, boundaries[1:]))
+
+    def _export_state(self) -> Dict[str, Any]:
+        """Export accumulators as plain (picklable) containers."""
+        state: Dict[str, Any] = {name: getattr(self, name) for name in self._SUM_FIELDS}
+        for name in self._COUNTER_FIELDS:
+            state[name] = dict(getattr(self, name))
+        state['date_range'] = dict(self.date_range)
+        state['failure_details'] = self.failure_details
+        return state
+
+    def _merge_state(self, state: Dict[str, Any]):
+        """Merge accumulators exported by another analyzer into this one."""
+        for name in self._SUM_FIELDS:
+            setattr(self, name, getattr(self, name) + state[name])
+        for name in self._COUNTER_FIELDS:
+            target = getattr(self, name)
+            if isinstance(target, Counter):
+                target.update(state[name])
+            else:
+                for key, count in state[name].items():
+                    target[key] += count
+
+        other_min = state['date_range']['min']
+        other_max = state['date_range']['max']
+        if other_min is not None and (self.date_range['min'] is None or other_min < self.date_range['min']):
+            self.date_range['min'] = other_min
+        if other_max is not None and (self.date_range['max'] is None or other_max > self.date_range['max']):
+            self.date_range['max'] = other_max
+
+        for column, values in state['failure_details'].items():
+            self.failure_details[column].extend(values)
+
     def generate_report(self) -> Dict[str, Any]:
         """Generate the analysis report from collected data."""
         if self.total_requests == 0:
@@ -295,13 +763,15 @@ class AIBotAnalyzer:
         total_successes = sum(self.bot_successes.values())
         overall_success_rate = (total_successes / self.total_requests) * 100
 
+        # Per-bot success rates, shared with the insight methods below.
+        # Indexing the defaultdict also gives bots without successes an entry.
+        success_rates = self.insights.compute_success_rates(self.bot_requests, self.bot_successes)
+
         # Bot statistics
         bot_stats = []
-        for bot_type in sorted(self.bot_requests.keys(), key=lambda x: self.bot_requests[x], reverse=True):
-            count = self.bot_requests[bot_type]
-            successes = self.bot_successes[bot_type]
+        for bot_type, count in self.bot_requests.most_common():
             percentage = (count / self.total_requests) * 100
-            success_rate = (successes / count * 100) if count > 0 else 0
+            success_rate = success_rates[bot_type]
 
             bot_stats.append({
                 'type': bot_type,
@@ -324,98 +794,112 @@ class AIBotAnalyzer:
         failure_types = [{'type': ft, 'count': count} for ft, count in failure_counts.most_common()]
 
         # Generate insights
+        url_failure_types = _pivot(self.url_failure_types)
+        bot_section_preferences = _pivot(self.bot_section_preferences)
+
         time_analysis = self.insights.analyze_time_patterns(
             dict(self.hourly_traffic),
             dict(self.daily_traffic),
-            {k: dict(v) for k, v in self.hourly_by_bot.items()}
+            _pivot(self.hourly_by_bot)
         )
 
         behavior_analysis = self.insights.analyze_bot_behavior(
             dict(self.bot_sessions),
             dict(self.bot_requests),
             dict(self.bot_successes),
-            {k: Counter(v) for k, v in self.bot_url_preferences.items()}
+            _pivot(self.bot_url_preferences),
+            success_rates=success_rates
         )
 
         failure_analysis = self.insights.analyze_failures(
             self.failure_details,
-            {k: Counter(v) for k, v in self.url_failure_types.items()},
+            url_failure_types,
             self.total_requests
         )
 
         recommendations = self.insights.generate_recommendations(
             self.url_failures,
-            {k: Counter(v) for k, v in self.url_failure_types.items()},
+            url_failure_types,
             dict(self.bot_requests),
             dict(self.bot_successes),
             self.url_requests,
-            self.total_requests
+            self.total_requests,
+            success_rates=success_rates
         )
 
         comparisons = self.insights.generate_comparisons(
             dict(self.bot_requests),
             dict(self.bot_successes),
             self.url_requests,
-            self.url_failures
+            self.url_failures,
+            success_rates=success_rates
         )
 
-        # NEW: Generate new insight analyses
+        # NEW: Generate new insight analyses (disabled features report {})
+        features = self.config.features
         referrer_analysis = self.insights.analyze_referrers(
             dict(self.referrer_sources),
             dict(self.referrer_domains),
-            {k: dict(v) for k, v in self.bot_referrer_sources.items()}
-        )
+            _pivot(self.bot_referrer_sources)
+        ) if features.enable_referrer_analysis else {}
 
         site_structure = self.insights.analyze_site_structure(
             dict(self.section_hits),
             dict(self.crawl_depth),
-            {k: dict(v) for k, v in self.bot_section_preferences.items()}
-        )
+            bot_section_preferences
+        ) if features.enable_site_structure else {}
 
         crawl_efficiency = self.insights.analyze_crawl_efficiency(
             dict(self.content_types),
             self.total_requests
-        )
+        ) if features.enable_crawl_efficiency else {}
 
         compliance = self.insights.analyze_compliance(
             dict(self.robots_txt_accesses),
             dict(self.sitemap_accesses),
             list(self.bot_requests.keys())
-        )
+        ) if features.enable_compliance_tracking else {}
 
         query_params = self.insights.analyze_query_params(
             dict(self.url_params),
             dict(self.param_urls),
             self.total_requests
-        )
+        ) if features.enable_query_params else {}
 
         anomalies = self.insights.detect_anomalies(
             dict(self.daily_request_counts)
-        )
+        ) if features.enable_anomaly_detection else {}
 
         bot_versions = self.insights.analyze_bot_versions(
-            {k: dict(v) for k, v in self.bot_versions.items()}
-        )
+            _pivot(self.bot_versions)
+        ) if features.enable_bot_versions else {}
 
         seo_health = self.insights.calculate_seo_health(
             self.indexable_pages,
             self.non_indexable_pages,
             dict(self.status_codes)
-        )
+        ) if features.enable_seo_health else {}
 
         competitive = self.insights.compare_bot_aggression(
             dict(self.bot_requests),
-            {k: dict(v) for k, v in self.bot_section_preferences.items()},
+            bot_section_preferences,
             dict(self.bot_bytes)
-        )
+        ) if features.enable_competitive_analysis else {}
 
         # Calculate human vs bot ratio
         bot_percentage = (self.total_requests / self.total_all_requests * 100) if self.total_all_requests > 0 else 0
         human_percentage = 100 - bot_percentage
 
+        # Status code groups, reduced from the per-code counts
+        status_code_groups = {'2xx': 0, '3xx': 0, '4xx': 0, '5xx': 0}
+        for status, count in self.status_codes.items():
+            group = _STATUS_GROUPS[status] if status < 600 else None
+            if group is not None:
+                status_code_groups[group] += count
+
         # Status code breakdown with percentages
         status_breakdown = {}
-        for group, count in self.status_code_groups.items():
+        for group, count in status_code_groups.items():
             percentage = (count / self.total_requests * 100) if self.total_requests > 0 else 0
             status_breakdown[group] = {'count': count, 'percentage': round(percentage, 1)}
 
@@ -501,105 +985,54 @@ class AIBotAnalyzer:
 
     def _categorize_failure(self, status_code: int) -> str:
         """Categorize a failure status code."""
-        if 300 <= status_code < 400:
-            return "Redirect"
-        elif status_code == 404:
-            return "404 Not Found"
-        elif status_code == 500:
-            return "500 Server Error"
-        elif status_code == 503:
-            return "503 Service Unavailable"
-        elif 400 <= status_code < 500:
-            return f"{status_code} Client Error"
-        elif 500 <= status_code < 600:
-            return f"{status_code} Server Error"
-        return f"Unknown ({status_code})"
+        if 0 <= status_code < 600:
+            return _FAILURE_CATEGORIES[status_code]
+        return _describe_failure(status_code)
+
+    def _categorize_content_type(self, url: str) -> str:
+        """Categorize a URL by its file extension."""
+        return _categorize_content_type(url)
 
     def _categorize_referrer(self, referrer: str) -> str:
         """Categorize referrer as direct, search, or external."""
-        if not referrer or referrer == '-' or referrer == '':
-            return 'direct'
-
-        referrer_lower = referrer.lower()
-        search_engines = ['google', 'bing', 'yahoo', 'duckduckgo', 'baidu', 'yandex']
-        for engine in search_engines:
-            if engine in referrer_lower:
-                return 'search'
-
-        return 'external'
+        return _categorize_referrer(referrer)
 
     def _extract_domain(self, url: str) -> Optional[str]:
         """Extract domain from URL."""
-        try:
-            parsed = urlparse(url)
-            return parsed.netloc if parsed.netloc else None
-        except Exception:
-            return None
+        return _extract_domain(url)
 
     def _extract_section(self, url: str) -> str:
         """Extract the site section from URL."""
-        path = url.split('?')[0]
-        if path == '/' or path == '':
-            return 'homepage'
-
-        parts = [p for p in path.split('/') if p]
-        if not parts:
-            return 'homepage'
-
-        first_part = parts[0].lower()
-        common_sections = ['blog', 'products', 'services', 'about', 'contact',
-                          'news', 'articles', 'category', 'categories', 'tag',
-                          'tags', 'shop', 'store', 'docs', 'documentation',
-                          'api', 'help', 'support', 'faq', 'pricing']
-
-        if first_part in common_sections:
-            return f'/{first_part}/'
-
-        # Check for asset directories
-        asset_patterns = ['wp-content', 'static', 'assets', 'images', 'img',
-                         'css', 'js', 'fonts', 'media']
-        if first_part in asset_patterns:
-            return '/assets/'
-
-        return f'/{first_part}/'
+        return _parse_path(url)[0]
 
     def _calculate_depth(self, url: str) -> int:
         """Calculate crawl depth from URL."""
-        path = url.split('?')[0]
-        parts = [p for p in path.split('/') if p]
-        depth = len(parts)
-        return min(depth, 5)  # Cap at 5 for grouping
+        return _parse_path(url)[1]
 
     def _extract_params(self, url: str) -> List[str]:
         """Extract query parameter names from URL."""
-        try:
-            if '?' not in url:
-                return []
-            query_string = url.split('?', 1)[1]
-            params = parse_qs(query_string)
-            return list(params.keys())
-        except Exception:
-            return []
+        return list(_extract_params(url))
 
     def _extract_bot_version(self, user_agent: str) -> str:
         """Extract bot version from user agent string."""
-        if not user_agent:
-            return 'unknown'
-
-        # Common version patterns
-        version_patterns = [
-            r'GPTBot/(\d+\.?\d*)',
-            r'ClaudeBot/(\d+\.?\d*)',
-            r'Googlebot/(\d+\.?\d*)',
-            r'bingbot/(\d+\.?\d*)',
-            r'PerplexityBot/(\d+\.?\d*)',
-            r'anthropic-ai/(\d+\.?\d*)',
-            r'/(\d+\.\d+)',  # Generic version pattern
-        ]
-
-        for pattern in version_patterns:
-            match = re.search(pattern, user_agent, re.IGNORECASE)
-            if match:
-                return match.group(1)
-
-        return 'unknown'
+        return _extract_bot_version(user_agent)
+
+
+def _analyze_chunk(
+    config: Config,
+    log_file: str,
+    start: int,
+    end: int,
+    ignore_homepage_redirects: bool
+) -> Tuple[Dict[str, Any], Dict[str, List]]:
+    """
+    Worker entry point: analyze one byte range of a log file.
+
+    Returns:
+        Tuple of (exported accumulators, IP sessions)
+    """
+    analyzer = AIBotAnalyzer(config)
+    ip_sessions: Dict[str, List] = defaultdict(list)
+    analyzer._analyze_range(log_file, start, end, ignore_homepage_redirects, ip_sessions)
+
+    return analyzer._export_state(), dict(ip_sessions)
@@ -2,12 +2,14 @@
 Configuration management for AI Bot Traffic Analyzer.
 """
 
+import ipaddress
 from dataclasses import dataclass, field
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class BotPattern:
     """Configuration for a bot detection pattern."""
     name: str
@@ -56,6 +58,14 @@ DEFAULT_BOT_PATTERNS: List[BotPattern] = [
     ),
 ]
 
+# Read-only views of the defaults, keyed by display name
+DEFAULT_PATTERNS_BY_BOT: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {bp.display_name: tuple(bp.patterns) for bp in DEFAULT_BOT_PATTERNS}
+)
+DEFAULT_CATEGORIES_BY_BOT: Mapping[str, str] = MappingProxyType(
+    {bp.display_name: bp.category for bp in DEFAULT_BOT_PATTERNS}
+)
+
 
 # Known bot IP ranges (for optional IP-based detection)
 KNOWN_BOT_IP_RANGES: Dict[str, List[str]] = {
@@ -76,7 +86,60 @@ KNOWN_BOT_IP_RANGES: Dict[str, List[str]] = {
 }
 
 
-@dataclass
+def _index_ip_ranges(ranges: Dict[str, List[str]]) -> List[Tuple[int, int, Dict[int, str]]]:
+    """
+    Index CIDR ranges for longest-prefix matching.
+
+    Returns (ip version, prefix length, {network address: bot name})
+    groups, most specific prefix first.
+    """
+    groups: Dict[Tuple[int, int], Dict[int, str]] = {}
+    for bot_name, cidrs in ranges.items():
+        for cidr in cidrs:
+            network = ipaddress.ip_network(cidr)
+            key = (network.version, network.prefixlen)
+            groups.setdefault(key, {})[int(network.network_address)] = bot_name
+    return [(version, prefix, networks)
+            for (version, prefix), networks in sorted(groups.items(), key=lambda g: g[0][1], reverse=True)]
+
+
+_BOT_IP_INDEX = _index_ip_ranges(KNOWN_BOT_IP_RANGES)
+
+
+def match_bot_ip(ip: str) -> Optional[str]:
+    """
+    Find the known bot whose IP range contains an address.
+
+    Args:
+        ip: IPv4 or IPv6 address as a string
+
+    Returns:
+        Bot name from KNOWN_BOT_IP_RANGES, or None if no range matches
+        or the address is invalid
+    """
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+
+    value = int(address)
+    bits = address.max_prefixlen
+    for version, prefix, networks in _BOT_IP_INDEX:
+        if version != address.version:
+            continue
+        host_bits = bits - prefix
+        bot_name = networks.get(value >> host_bits << host_bits)
+        if bot_name is not None:
+            return bot_name
+    return None
+
+
+# Health statuses from best to worst, and the color shown for each
+HEALTH_STATUSES = ("good", "warning", "critical")
+HEALTH_COLORS = ("#22c55e", "#eab308", "#ef4444")
+
+
+@dataclass(slots=True)
 class FeatureToggles:
     """Feature toggles for optional functionality."""
     enable_referrer_analysis: bool = True
@@ -91,7 +154,7 @@ class FeatureToggles:
     enable_geographic_analysis: bool = False  # Requires geoip2
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     """Main configuration class for the analyzer."""
 
@@ -130,17 +193,59 @@ class Config:
     reports_dir: Path = field(default_factory=lambda: Path.home() / "ai-bot-analyzer" / "output" / "reports")
     logs_dir: Path = field(default_factory=lambda: Path.home() / "ai-bot-analyzer" / "output" / "logs")
 
+    # Lookups derived from the lists above (see _build_status_lookups)
+    _success_codes: frozenset = field(init=False, repr=False, compare=False)
+    _redirect_codes: frozenset = field(init=False, repr=False, compare=False)
+    _homepage_paths: frozenset = field(init=False, repr=False, compare=False)
+    _status_categories: Dict[int, str] = field(init=False, repr=False, compare=False)
+    # Copies of the lists the lookups were built from
+    _lookup_source: Tuple[List, ...] = field(default=(), init=False, repr=False, compare=False)
+
     def __post_init__(self):
         """Initialize bot patterns and ensure output directories exist."""
         if not self.bot_patterns:
             self.bot_patterns = self._load_bot_patterns()
+        self._build_status_lookups()
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.reports_dir.mkdir(parents=True, exist_ok=True)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
 
+    def _status_lookup_lists(self) -> Tuple[List, ...]:
+        """The code/path lists the status lookups are derived from."""
+        return (self.success_codes, self.redirect_codes, self.client_error_codes,
+                self.server_error_codes, self.homepage_paths)
+
+    def _refresh_status_lookups(self):
+        """Rebuild the status lookups if a code/path list has changed."""
+        # The lists are public and may be reassigned or edited in place;
+        # comparing them with the copies taken at build time catches both
+        if self._status_lookup_lists() != self._lookup_source:
+            self._build_status_lookups()
+
+    def _build_status_lookups(self):
+        """Precompute hashed lookups for the status code and homepage lists."""
+        self._lookup_source = tuple(list(values) for values in self._status_lookup_lists())
+        self._success_codes = frozenset(self.success_codes)
+        self._redirect_codes = frozenset(self.redirect_codes)
+        self._homepage_paths = frozenset(self.homepage_paths)
+
+        # Later assignments win, so the first matching category below has
+        # priority, as in an if/elif chain
+        self._status_categories = {}
+        for category, codes in (
+            ("server_error", self.server_error_codes),
+            ("client_error", self.client_error_codes),
+            ("redirect", self.redirect_codes),
+            ("success", self.success_codes),
+        ):
+            for code in codes:
+                self._status_categories[code] = category
+
     def _load_bot_patterns(self) -> Dict[str, List[str]]:
         """Load default bot patterns."""
-        return {bp.display_name: bp.patterns for bp in DEFAULT_BOT_PATTERNS}
+        # Fresh lists, so add_pattern() on one config cannot leak into
+        # the module defaults
+        return {bot_type: list(patterns) for bot_type, patterns in DEFAULT_PATTERNS_BY_BOT.items()}
 
     def get_bot_patterns(self) -> Dict[str, List[str]]:
         """Get bot patterns dictionary."""
@@ -148,46 +253,37 @@ class Config:
 
     def is_success(self, status_code: int, url: str = "") -> bool:
         """Check if a status code represents success."""
-        if status_code in self.success_codes:
+        self._refresh_status_lookups()
+        if status_code in self._success_codes:
             return True
 
         if self.ignore_homepage_redirects:
-            if status_code in self.redirect_codes and url in self.homepage_paths:
+            if status_code in self._redirect_codes and url in self._homepage_paths:
                 return True
 
         return False
 
     def get_status_category(self, status_code: int) -> str:
         """Get the category for a status code."""
-        if status_code in self.success_codes:
-            return "success"
-        elif status_code in self.redirect_codes:
-            return "redirect"
-        elif status_code in self.client_error_codes:
-            return "client_error"
-        elif status_code in self.server_error_codes:
-            return "server_error"
-        else:
-            return "unknown"
+        self._refresh_status_lookups()
+        return self._status_categories.get(status_code, "unknown")
 
-    def get_health_status(self, success_rate: float) -> str:
-        """Get health status based on success rate."""
+    def _health_level(self, success_rate: float) -> int:
+        """Index into HEALTH_STATUSES/HEALTH_COLORS for a success rate."""
         if success_rate >= self.health_good_threshold:
-            return "good"
+            return 0
         elif success_rate >= self.health_warning_threshold:
-            return "warning"
+            return 1
         else:
-            return "critical"
+            return 2
+
+    def get_health_status(self, success_rate: float) -> str:
+        """Get health status based on success rate."""
+        return HEALTH_STATUSES[self._health_level(success_rate)]
 
     def get_health_color(self, success_rate: float) -> str:
         """Get color for health status."""
-        status = self.get_health_status(success_rate)
-        colors = {
-            "good": "#22c55e",
-            "warning": "#eab308",
-            "critical": "#ef4444"
-        }
-        return colors.get(status, "#6b7280")
+        return HEALTH_COLORS[self._health_level(success_rate)]
 
     def get(self, key, default=None):
         """Get a config value by key."""
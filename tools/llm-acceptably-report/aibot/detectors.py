@@ -6,11 +6,90 @@ Identifies AI bots by user-agent string patterns.
 
 import re
 from dataclasses import dataclass
-from typing import Optional, Dict, List
-from .config import get_config
+from functools import lru_cache
+from typing import Optional, Dict, Iterable, List, Tuple
+from .config import DEFAULT_CATEGORIES_BY_BOT, get_config
 
+# google-re2 matches in linear time, which keeps hostile user-agents from
+# triggering catastrophic backtracking in custom regex patterns
+try:
+    import re2
+except ImportError:
+    re2 = None
 
-@dataclass
+# Characters that make a detection pattern more than a plain substring
+_REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+def _is_literal(pattern: str) -> bool:
+    """Check whether a pattern matches only its own text."""
+    return not any(char in _REGEX_METACHARACTERS for char in pattern)
+
+
+def _compile_regex(pattern: str):
+    """
+    Compile for case-insensitive matching, with re2 when installed, else
+    (or if re2 rejects it) with re.
+    """
+    if re2 is not None:
+        try:
+            # re2 accepts a leading flag group where re takes IGNORECASE
+            return re2.compile(f'(?i){pattern}')
+        except re2.error:
+            # e.g. backreferences or lookaround, which re2 does not support
+            pass
+    return re.compile(pattern, re.IGNORECASE)
+
+
+# Numbered backreferences and conditionals, whose group numbers shift once
+# a pattern is joined into an alternation with others
+_NUMBERED_GROUP_REF = re.compile(r'\\[1-9]|\(\?\(\d')
+
+
+def _compile_union(patterns: List[str]) -> Tuple[re.Pattern, ...]:
+    """
+    Compile regex patterns into one alternation, or one regex each when
+    they cannot share one (global inline flags such as a mid-pattern (?i),
+    group names repeated across patterns, numbered group references).
+    """
+    if len(patterns) > 1 and not any(_NUMBERED_GROUP_REF.search(p) for p in patterns):
+        try:
+            return (_compile_regex('|'.join(f'(?:{p})' for p in patterns)),)
+        except re.error:
+            pass
+    return tuple(_compile_pattern(p) for p in patterns)
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str):
+    """Compile a single regex pattern for case-insensitive matching."""
+    return _compile_regex(pattern)
+
+
+@lru_cache(maxsize=32)
+def _build_matchers(bot_patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]
+                    ) -> Tuple[Tuple[str, Tuple[str, ...], Tuple[re.Pattern, ...]], ...]:
+    """
+    Pre-compile the patterns of each bot type.
+
+    Plain-text patterns (all of the defaults) are kept as lowercased
+    substrings and checked with ``in`` against the lowercased user-agent;
+    only genuine regexes are compiled, unchanged and case-insensitively,
+    into one alternation per bot type where they allow it (see
+    _compile_union), and search the original user-agent.
+
+    Cached on the (bot_type, patterns) pairs, so every detector built
+    from the same configuration shares one set of compiled matchers.
+    """
+    matchers = []
+    for bot_type, patterns in bot_patterns:
+        literals = tuple(p.lower() for p in patterns if _is_literal(p))
+        regexes = [p for p in patterns if not _is_literal(p)]
+        matchers.append((bot_type, literals, _compile_union(regexes)))
+    return tuple(matchers)
+
+
+@dataclass(slots=True)
 class BotInfo:
     """Information about a detected bot."""
     name: str
@@ -22,19 +101,34 @@ class BotInfo:
 class BotDetector:
     """Detects AI bots from user-agent strings."""
 
+    # Maximum number of distinct user-agents remembered by identify()
+    IDENTIFY_CACHE_SIZE = 10_000
+
     def __init__(self, config=None):
         """Initialize with configuration."""
         self.config = config or get_config()
         self.bot_patterns = self.config.get_bot_patterns()
-        self._compiled_patterns: Dict[str, List[re.Pattern]] = {}
+        # (bot_type, lowercased literal patterns, regexes for the rest) per
+        # bot, in config order
+        self._matchers: Tuple[Tuple[str, Tuple[str, ...], Tuple[re.Pattern, ...]], ...] = ()
+        # Snapshot of bot_patterns the matchers were built from
+        self._compiled_key: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+        # Log files repeat a handful of user-agents, so remember results
+        # (least recently used entries are evicted once the cache is full)
+        self._identify_cached = lru_cache(maxsize=self.IDENTIFY_CACHE_SIZE)(self._identify_uncached)
         self._compile_patterns()
 
+    def _patterns_key(self) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """Hashable snapshot of the current bot patterns."""
+        return tuple(
+            (bot_type, tuple(patterns)) for bot_type, patterns in self.bot_patterns.items()
+        )
+
     def _compile_patterns(self):
-        """Pre-compile regex patterns for better performance."""
-        for bot_type, patterns in self.bot_patterns.items():
-            self._compiled_patterns[bot_type] = [
-                re.compile(pattern, re.IGNORECASE) for pattern in patterns
-            ]
+        """Load the compiled matchers for the current bot patterns."""
+        self._identify_cached.cache_clear()
+        self._compiled_key = self._patterns_key()
+        self._matchers = _build_matchers(self._compiled_key)
 
     def identify(self, user_agent: str) -> Optional[str]:
         """
@@ -46,12 +140,38 @@ class BotDetector:
         Returns:
             Bot type name if matched, None otherwise
         """
+        return self._identify_cached(user_agent)
+
+    def identify_many(self, user_agents: Iterable[str]) -> List[Optional[str]]:
+        """
+        Identify the bot type of each user-agent in a batch.
+
+        Each distinct user-agent is matched once, however often it repeats.
+
+        Args:
+            user_agents: The user-agent strings to check
+
+        Returns:
+            Bot type name (or None) per user-agent, in input order
+        """
+        user_agents = list(user_agents)
+        bot_types = {ua: self.identify(ua) for ua in dict.fromkeys(user_agents)}
+        return [bot_types[ua] for ua in user_agents]
+
+    def _identify_uncached(self, user_agent: str) -> Optional[str]:
+        """Run the pattern match behind identify()."""
         if not user_agent:
             return None
 
-        for bot_type, compiled in self._compiled_patterns.items():
-            for pattern in compiled:
-                if pattern.search(user_agent):
+        # Lowercase once per distinct user-agent so literals can use a plain
+        # substring search; regexes carry their own case-insensitive flag
+        user_agent_lc = user_agent.lower()
+        for bot_type, literals, regexes in self._matchers:
+            for literal in literals:
+                if literal in user_agent_lc:
+                    return bot_type
+            for regex in regexes:
+                if regex.search(user_agent):
                     return bot_type
 
         return None
@@ -66,31 +186,31 @@ class BotDetector:
         Returns:
             BotInfo object if matched, None otherwise
         """
-        if not user_agent:
+        bot_type = self.identify(user_agent)
+        if bot_type is None:
             return None
 
-        for bot_type, patterns in self.bot_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, user_agent, re.IGNORECASE):
-                    return BotInfo(
-                        name=bot_type,
-                        category=self._get_category(bot_type),
-                        matched_pattern=pattern,
-                        user_agent=user_agent
-                    )
+        # identify() has settled the bot type; find which of its patterns
+        # matched first, using the same rules as the compiled matchers
+        user_agent_lc = user_agent.lower()
+        for pattern in self.bot_patterns[bot_type]:
+            if _is_literal(pattern):
+                matched = pattern.lower() in user_agent_lc
+            else:
+                matched = _compile_pattern(pattern).search(user_agent) is not None
+            if matched:
+                return BotInfo(
+                    name=bot_type,
+                    category=self._get_category(bot_type),
+                    matched_pattern=pattern,
+                    user_agent=user_agent
+                )
 
         return None
 
     def _get_category(self, bot_type: str) -> str:
         """Get the category for a bot type."""
-        categories = {
-            'ChatGPT/OpenAI': 'AI Assistant',
-            'Perplexity': 'AI Search',
-            'Bard/Gemini': 'AI Assistant',
-            'Claude/Anthropic': 'AI Assistant',
-            'Other AI Bots': 'Other AI'
-        }
-        return categories.get(bot_type, 'Unknown')
+        return DEFAULT_CATEGORIES_BY_BOT.get(bot_type, 'Unknown')
 
     def is_bot(self, user_agent: str) -> bool:
         """
@@ -115,11 +235,37 @@ class BotDetector:
         Args:
             bot_type: The bot type to add pattern for
             pattern: The regex pattern to match
+
+        Raises:
+            re.error: If the pattern is not a valid regex
         """
+        # Validate before touching bot_patterns, which is shared with the
+        # config: a bad pattern must not break every later detector
+        if not _is_literal(pattern):
+            _compile_pattern(pattern)
+
         if bot_type not in self.bot_patterns:
             self.bot_patterns[bot_type] = []
 
         self.bot_patterns[bot_type].append(pattern)
-        self._compiled_patterns[bot_type] = [
-            re.compile(p, re.IGNORECASE) for p in self.bot_patterns[bot_type]
-        ]
+        self._compile_patterns()
+
+
+# Singleton instance
+_detector = None
+
+
+def get_bot_detector() -> BotDetector:
+    """
+    Get the detector for the global config instance.
+
+    Recompiled (or rebuilt, if the patterns dict was replaced) when the
+    global config's bot patterns have changed since the last call.
+    """
+    global _detector
+    config = get_config()
+    if _detector is None or _detector.bot_patterns is not config.bot_patterns:
+        _detector = BotDetector(config)
+    elif _detector._patterns_key() != _detector._compiled_key:
+        _detector._compile_patterns()
+    return _detector
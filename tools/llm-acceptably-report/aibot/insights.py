@@ -1,8 +1,21 @@
 """Analysis & Insights Generation"""
 from collections import defaultdict, Counter
 from typing import Dict, List, Any
+from operator import itemgetter
+import heapq
+import re
 import statistics
 
+# Sort position of each weekday name in the daily distribution
+_DAY_ORDER = {day: i for i, day in enumerate(
+    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])}
+_HOUR_LABELS = tuple(f"{hour:02d}:00" for hour in range(24))
+
+# Query parameter name fragments that hint at crawl traps (session/tracking
+# params), matched in one scan of the lowercased parameter name
+_TRAP_INDICATORS = ['session', 'sid', 'phpsessid', 'jsessionid', 'token', 'utm_', 'ref', 'sort', 'order', 'page']
+_TRAP_RE = re.compile('|'.join(map(re.escape, _TRAP_INDICATORS)))
+
 class InsightsEngine:
     def __init__(self, config=None):
         self.config = config
@@ -11,28 +24,29 @@ class InsightsEngine:
         if not hourly_traffic:
             return {}
         
-        peak_hour = max(hourly_traffic.items(), key=lambda x: x[1])
-        quiet_hour = min(hourly_traffic.items(), key=lambda x: x[1])
+        hour_count = hourly_traffic.__getitem__
+        peak_hour = max(hourly_traffic, key=hour_count)
+        quiet_hour = min(hourly_traffic, key=hour_count)
         
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        daily_sorted = sorted(daily_traffic.items(), 
-                            key=lambda x: day_order.index(x[0]) if x[0] in day_order else 7)
-        busiest_day = max(daily_traffic.items(), key=lambda x: x[1]) if daily_traffic else ('N/A', 0)
+        daily_sorted = sorted(daily_traffic.items(),
+                            key=lambda x: _DAY_ORDER.get(x[0], 7))
+        busiest_day = max(daily_traffic.items(), key=itemgetter(1)) if daily_traffic else ('N/A', 0)
         
         bot_peak_times = {}
         for bot_type, hourly_data in hourly_by_bot.items():
             if hourly_data:
-                peak = max(hourly_data.items(), key=lambda x: x[1])
-                bot_peak_times[bot_type] = f"{peak[0]:02d}:00 ({peak[1]} requests)"
+                peak = max(hourly_data, key=hourly_data.__getitem__)
+                bot_peak_times[bot_type] = f"{peak:02d}:00 ({hourly_data[peak]} requests)"
         
-        hourly_dist = [{'hour': f"{hour:02d}:00", 'count': hourly_traffic.get(hour, 0)} for hour in range(24)]
+        hourly_dist = [{'hour': label, 'count': hourly_traffic.get(hour, 0)}
+                       for hour, label in enumerate(_HOUR_LABELS)]
         daily_dist = [{'day': day, 'count': count} for day, count in daily_sorted]
         
         return {
-            'peak_hour': f"{peak_hour[0]:02d}:00 - {peak_hour[0]+1:02d}:00",
-            'peak_hour_count': peak_hour[1],
-            'quiet_hour': f"{quiet_hour[0]:02d}:00 - {quiet_hour[0]+1:02d}:00",
-            'quiet_hour_count': quiet_hour[1],
+            'peak_hour': f"{peak_hour:02d}:00 - {peak_hour+1:02d}:00",
+            'peak_hour_count': hourly_traffic[peak_hour],
+            'quiet_hour': f"{quiet_hour:02d}:00 - {quiet_hour+1:02d}:00",
+            'quiet_hour_count': hourly_traffic[quiet_hour],
             'busiest_day': busiest_day[0],
             'busiest_day_count': busiest_day[1],
             'bot_peak_times': bot_peak_times,
@@ -40,14 +54,25 @@ class InsightsEngine:
             'daily_distribution': daily_dist
         }
     
-    def analyze_bot_behavior(self, bot_sessions, bot_requests, bot_successes, bot_url_preferences):
+    def compute_success_rates(self, bot_requests, bot_successes):
+        """
+        Success rate (percent) of each bot, in bot_requests order.
+
+        The result can be passed as ``success_rates`` to the methods that
+        need it, so it is only computed once per report.
+        """
+        return {bot_type: (bot_successes[bot_type] / count * 100) if count > 0 else 0
+                for bot_type, count in bot_requests.items()}
+    
+    def analyze_bot_behavior(self, bot_sessions, bot_requests, bot_successes, bot_url_preferences,
+                             success_rates=None):
         behavior = {}
-        for bot_type in bot_requests.keys():
+        if success_rates is None:
+            success_rates = self.compute_success_rates(bot_requests, bot_successes)
+        for bot_type, success_rate in success_rates.items():
             sessions = bot_sessions.get(bot_type, [])
-            session_lengths = [len(session) for session in sessions]
-            avg_session_length = sum(session_lengths) / len(session_lengths) if session_lengths else 0
+            avg_session_length = sum(map(len, sessions)) / len(sessions) if sessions else 0
             top_urls = bot_url_preferences[bot_type].most_common(5)
-            success_rate = (bot_successes[bot_type] / bot_requests[bot_type] * 100) if bot_requests[bot_type] > 0 else 0
             
             behavior[bot_type] = {
                 'avg_pages_per_session': round(avg_session_length, 1),
@@ -58,37 +83,39 @@ class InsightsEngine:
         return behavior
     
     def analyze_failures(self, failure_details, url_failure_types, total_requests):
-        if not failure_details:
+        # failure_details holds parallel column lists (timestamp, url, status, ...)
+        failure_type_column = failure_details.get('failure_type')
+        if not failure_type_column:
             return {}
         
+        total_failures = len(failure_type_column)
         root_causes = []
-        post_failures = [f for f in failure_details if f.get('method') == 'POST']
+        post_failures = failure_details['method'].count('POST')
         if post_failures:
-            post_failure_rate = len(post_failures) / len(failure_details) * 100
+            post_failure_rate = post_failures / total_failures * 100
             if post_failure_rate > 30:
                 root_causes.append({
                     'issue': 'POST Request Failures',
                     'severity': 'HIGH',
-                    'description': f'{len(post_failures)} failures on POST requests ({post_failure_rate:.1f}% of all failures)',
+                    'description': f'{post_failures} failures on POST requests ({post_failure_rate:.1f}% of all failures)',
                     'suggestion': 'Review form handling and API endpoints'
                 })
         
         url_failure_clusters = []
         for url, failure_types in url_failure_types.items():
-            total_failures = sum(failure_types.values())
-            if total_failures > 20:
-                dominant_type = max(failure_types.items(), key=lambda x: x[1])
+            url_failures = sum(failure_types.values())
+            if url_failures > 20:
+                dominant_type = max(failure_types.items(), key=itemgetter(1))
                 url_failure_clusters.append({
                     'url': url,
-                    'total_failures': total_failures,
+                    'total_failures': url_failures,
                     'primary_error': dominant_type[0],
                     'error_count': dominant_type[1]
                 })
-        url_failure_clusters.sort(key=lambda x: x['total_failures'], reverse=True)
+        url_failure_clusters.sort(key=itemgetter('total_failures'), reverse=True)
         
-        total_failures = len(failure_details)
         failure_impact = []
-        for failure_type, count in Counter([f['failure_type'] for f in failure_details]).most_common():
+        for failure_type, count in Counter(failure_type_column).most_common():
             percentage = (count / total_failures) * 100
             severity = 'HIGH' if percentage > 30 else 'MEDIUM' if percentage > 10 else 'LOW'
             failure_impact.append({
@@ -105,14 +132,14 @@ class InsightsEngine:
         }
     
     def generate_recommendations(self, url_failures, url_failure_types, bot_requests, 
-                                bot_successes, url_requests, total_requests):
+                                bot_successes, url_requests, total_requests, success_rates=None):
         recommendations = []
         priority_score = 100
         
         for url, count in url_failures.most_common(5):
             if count > 50:
                 failure_types = url_failure_types[url]
-                dominant_error = max(failure_types.items(), key=lambda x: x[1])[0]
+                dominant_error = max(failure_types, key=failure_types.__getitem__)
                 severity = 'HIGH' if count > 100 else 'MEDIUM'
                 recommendations.append({
                     'priority': priority_score,
@@ -124,8 +151,9 @@ class InsightsEngine:
                 })
                 priority_score -= 10
         
-        for bot_type in bot_requests.keys():
-            success_rate = (bot_successes[bot_type] / bot_requests[bot_type] * 100) if bot_requests[bot_type] > 0 else 0
+        if success_rates is None:
+            success_rates = self.compute_success_rates(bot_requests, bot_successes)
+        for bot_type, success_rate in success_rates.items():
             if success_rate < 50 and bot_requests[bot_type] > 10:
                 recommendations.append({
                     'priority': priority_score,
@@ -137,7 +165,7 @@ class InsightsEngine:
                 })
                 priority_score -= 5
         
-        recommendations.sort(key=lambda x: x['priority'], reverse=True)
+        recommendations.sort(key=itemgetter('priority'), reverse=True)
         return recommendations[:10]
     
     def _get_fix_suggestion(self, error_type, url):
@@ -149,12 +177,13 @@ class InsightsEngine:
             return 'Review redirect rules. Consider if redirect is necessary or add permanent redirect (301).'
         return 'Investigate the specific error'
     
-    def generate_comparisons(self, bot_requests, bot_successes, url_requests, url_failures):
+    def generate_comparisons(self, bot_requests, bot_successes, url_requests, url_failures,
+                             success_rates=None):
         comparisons = {}
         
-        bot_performance = [(bot, (bot_successes[bot] / bot_requests[bot] * 100) if bot_requests[bot] > 0 else 0) 
-                          for bot in bot_requests.keys()]
-        bot_performance.sort(key=lambda x: x[1], reverse=True)
+        if success_rates is None:
+            success_rates = self.compute_success_rates(bot_requests, bot_successes)
+        bot_performance = sorted(success_rates.items(), key=itemgetter(1), reverse=True)
         
         if len(bot_performance) >= 2:
             best_bot = bot_performance[0]
@@ -208,7 +237,7 @@ class InsightsEngine:
 
         # Top referrer domains
         top_domains = [{'domain': d, 'count': c}
-                      for d, c in sorted(referrer_domains.items(), key=lambda x: x[1], reverse=True)[:10]]
+                      for d, c in heapq.nlargest(10, referrer_domains.items(), key=itemgetter(1))]
 
         # Per-bot referrer sources
         bot_sources = {}
@@ -237,7 +266,7 @@ class InsightsEngine:
 
         # Section breakdown
         section_breakdown = []
-        for section, count in sorted(section_hits.items(), key=lambda x: x[1], reverse=True)[:15]:
+        for section, count in heapq.nlargest(15, section_hits.items(), key=itemgetter(1)):
             percentage = (count / total_hits) * 100
             section_breakdown.append({
                 'section': section,
@@ -262,7 +291,7 @@ class InsightsEngine:
         # Bot section preferences
         bot_preferences = {}
         for bot, sections in bot_section_preferences.items():
-            top_sections = sorted(sections.items(), key=lambda x: x[1], reverse=True)[:5]
+            top_sections = heapq.nlargest(5, sections.items(), key=itemgetter(1))
             bot_preferences[bot] = [{'section': s, 'count': c} for s, c in top_sections]
 
         return {
@@ -369,17 +398,16 @@ class InsightsEngine:
 
         # Top parameters
         top_params = [{'param': p, 'count': c}
-                     for p, c in sorted(url_params.items(), key=lambda x: x[1], reverse=True)[:10]]
+                     for p, c in heapq.nlargest(10, url_params.items(), key=itemgetter(1))]
 
         # URLs with params
         urls_with_params = [{'url': u, 'param_requests': c}
-                          for u, c in sorted(param_urls.items(), key=lambda x: x[1], reverse=True)[:10]]
+                          for u, c in heapq.nlargest(10, param_urls.items(), key=itemgetter(1))]
 
         # Detect potential crawl traps (URLs with session/tracking params)
-        trap_indicators = ['session', 'sid', 'phpsessid', 'jsessionid', 'token', 'utm_', 'ref', 'sort', 'order', 'page']
         potential_traps = []
         for param, count in url_params.items():
-            if any(trap in param.lower() for trap in trap_indicators) and count > 10:
+            if count > 10 and _TRAP_RE.search(param.lower()):
                 potential_traps.append({'param': param, 'count': count})
 
         return {
@@ -470,13 +498,19 @@ class InsightsEngine:
         # Calculate health score based on multiple factors
         score = indexable_rate
 
+        # Tally 4xx and 5xx responses in one pass over the status codes
+        error_4xx = error_5xx = 0
+        for status, count in status_codes.items():
+            if 400 <= status < 500:
+                error_4xx += count
+            elif 500 <= status < 600:
+                error_5xx += count
+
         # Penalize for 4xx errors
-        error_4xx = sum(c for s, c in status_codes.items() if 400 <= s < 500)
         error_rate_4xx = (error_4xx / total) * 100 if total > 0 else 0
         score -= min(30, error_rate_4xx)  # Max penalty of 30
 
         # Penalize for 5xx errors (more severe)
-        error_5xx = sum(c for s, c in status_codes.items() if 500 <= s < 600)
         error_rate_5xx = (error_5xx / total) * 100 if total > 0 else 0
         score -= min(40, error_rate_5xx * 2)  # Max penalty of 40
 
@@ -545,11 +579,16 @@ class InsightsEngine:
         # Attention distribution (how spread out is the crawling)
         attention_scores = {}
         for bot, sections in bot_section_preferences.items():
-            if sections:
+            if not sections:
+                continue
+            if len(sections) == 1:
+                # All hits in one section: fully concentrated
+                concentration = 1.0
+            else:
                 total_hits = sum(sections.values())
                 # Calculate entropy-like score
                 concentration = sum((c / total_hits) ** 2 for c in sections.values())
-                attention_scores[bot] = round((1 - concentration) * 100, 1)  # Higher = more spread out
+            attention_scores[bot] = round((1 - concentration) * 100, 1)  # Higher = more spread out
 
         return {
             'ranking': bot_metrics,
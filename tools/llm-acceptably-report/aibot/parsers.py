@@ -2,12 +2,102 @@
 Log File Parsing for Apache/Nginx Combined Format
 """
 
+import os
 import re
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 
+# Pattern for combined log format:
+# IP - - [timestamp] "METHOD URL HTTP/x.x" STATUS SIZE "referrer" "user-agent"
+# The referrer/user-agent tail is optional so plain common-format lines are
+# handled by the same match. As with the old separate combined pattern, the
+# tail is only read when ident/auth are both "-" (group 2) and the request
+# line ends in an HTTP version (group 6); other lines keep an empty
+# user-agent. Leading whitespace is skipped and anything after the match is
+# ignored, so lines need no strip(). Compiled once and shared.
+_LOG_RE = re.compile(
+    r'\s*(?P<ip>[\d\.]+)\s+(?:(-\s+-)|\S+\s+\S+)\s+'
+    r'\[(?P<timestamp>[^\]]+)\]\s+'
+    r'"(?P<method>\w+)\s+(?P<url>\S+)(?:(\s+HTTP/[\d\.]+)"|[^"]*")\s+'
+    r'(?P<status>\d+)\s+'
+    r'(?P<size>\d+|-)'
+    r'(?(2)(?(6)(?:\s+"(?P<referrer>[^"]*)"\s+"(?P<user_agent>[^"]*)")?))',
+    re.ASCII
+)
+
+# Bytes variant of _LOG_RE for scanning a whole buffer (e.g. an mmap'd file)
+# with finditer(). Each record is anchored at a line start (after \n, or
+# after a lone \r as text-mode reading accepted) and its separators/fields
+# may not cross line breaks, so one record never spills into the next line.
+_LOG_BYTES_RE = re.compile(
+    rb'(?:^|(?<=\r))[^\S\r\n]*'
+    rb'(?P<ip>[\d\.]+)[^\S\r\n]+(?:(-[^\S\r\n]+-)|\S+[^\S\r\n]+\S+)[^\S\r\n]+'
+    rb'\[(?P<timestamp>[^\]\r\n]+)\][^\S\r\n]+'
+    rb'"(?P<method>\w+)[^\S\r\n]+(?P<url>\S+)(?:([^\S\r\n]+HTTP/[\d\.]+)"|[^"\r\n]*")[^\S\r\n]+'
+    rb'(?P<status>\d+)[^\S\r\n]+'
+    rb'(?P<size>\d+|-)'
+    rb'(?(2)(?(6)(?:[^\S\r\n]+"(?P<referrer>[^"\r\n]*)"[^\S\r\n]+"(?P<user_agent>[^"\r\n]*)")?))',
+    re.ASCII | re.MULTILINE
+)
+
+# Named fields of both patterns, in order (the numbered groups are only the
+# conditions for reading the referrer/user-agent tail)
+_FIELDS = ('ip', 'timestamp', 'method', 'url', 'status', 'size', 'referrer', 'user_agent')
+
+# Month abbreviations as accepted by strptime's %b (case-insensitive)
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+
+@lru_cache(maxsize=64)
+def _utc_offset(offset: str) -> timezone:
+    """Build the tzinfo strptime's %z gives for a '+HHMM' offset."""
+    minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+    return timezone(timedelta(minutes=-minutes if offset[0] == '-' else minutes))
+
+
+def _parse_clf_timestamp(ts: str) -> Optional[datetime]:
+    """
+    Parse a fixed-width '10/Jan/2025:14:30:00 +0000' timestamp by slicing.
+
+    Handles the two common-log layouts (with and without the offset)
+    exactly as strptime would; returns None for anything else, so the
+    caller can fall back to strptime.
+    """
+    length = len(ts)
+    if length == 26:
+        if ts[20] != ' ' or ts[21] not in '+-' or ts[24] > '5':
+            return None
+        digits = ts[0:2] + ts[7:11] + ts[12:14] + ts[15:17] + ts[18:20] + ts[22:26]
+    elif length == 20:
+        digits = ts[0:2] + ts[7:11] + ts[12:14] + ts[15:17] + ts[18:20]
+    else:
+        return None
+
+    if (ts[2] != '/' or ts[6] != '/' or ts[11] != ':' or ts[14] != ':' or ts[17] != ':'
+            or not (digits.isascii() and digits.isdigit())):
+        return None
+    month = _MONTHS.get(ts[3:6].lower())
+    if month is None:
+        return None
+
+    try:
+        return datetime(
+            int(ts[7:11]), month, int(ts[0:2]),
+            int(ts[12:14]), int(ts[15:17]), int(ts[18:20]),
+            tzinfo=_utc_offset(ts[21:26]) if length == 26 else None
+        )
+    except ValueError:
+        # Out-of-range field; strptime rejects these too
+        return None
+
+
 @dataclass
 class LogEntry:
     """Represents a parsed log entry."""
@@ -31,27 +121,6 @@ class LogEntry:
 class LogParser:
     """Parser for Apache/Nginx combined log format."""
 
-    # Pattern for combined log format:
-    # IP - - [timestamp] "METHOD URL HTTP/x.x" STATUS SIZE "referrer" "user-agent"
-    COMBINED_FORMAT = re.compile(
-        r'(?P<ip>[\d\.]+)\s+-\s+-\s+'
-        r'\[(?P<timestamp>[^\]]+)\]\s+'
-        r'"(?P<method>\w+)\s+(?P<url>[^\s]+)\s+HTTP/[\d\.]+"\s+'
-        r'(?P<status>\d+)\s+'
-        r'(?P<size>\d+|-)\s+'
-        r'"(?P<referrer>[^"]*)"\s+'
-        r'"(?P<user_agent>[^"]*)"'
-    )
-
-    # Alternative patterns for edge cases
-    SIMPLE_FORMAT = re.compile(
-        r'(?P<ip>[\d\.]+)\s+\S+\s+\S+\s+'
-        r'\[(?P<timestamp>[^\]]+)\]\s+'
-        r'"(?P<method>\w+)\s+(?P<url>\S+)[^"]*"\s+'
-        r'(?P<status>\d+)\s+'
-        r'(?P<size>\d+|-)'
-    )
-
     # Timestamp formats to try
     TIMESTAMP_FORMATS = [
         '%d/%b/%Y:%H:%M:%S %z',      # 10/Jan/2025:14:30:00 +0000
@@ -59,33 +128,76 @@ class LogParser:
         '%Y-%m-%d %H:%M:%S',          # 2025-01-10 14:30:00
     ]
 
+    # Bytes read per block by parse_file()
+    READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+    # Maximum number of distinct timestamp strings remembered
+    TIMESTAMP_CACHE_SIZE = 8192
+
+    def __init__(self):
+        """Initialize the timestamp cache."""
+        # Bursty traffic repeats the same second across many lines
+        self._parse_timestamp_cached = lru_cache(maxsize=self.TIMESTAMP_CACHE_SIZE)(
+            self._parse_timestamp_uncached
+        )
+
     def parse(self, line: str) -> Optional[dict]:
         """
         Parse a single log line.
 
         Returns a dictionary with parsed fields or None if parsing fails.
         """
-        line = line.strip()
-        if not line:
+        match = _LOG_RE.match(line)
+        if not match:
             return None
 
-        # Try combined format first
-        match = self.COMBINED_FORMAT.match(line)
+        return self._finish(match.groupdict())
 
-        if not match:
-            # Try simple format as fallback
-            match = self.SIMPLE_FORMAT.match(line)
-            if match:
-                data = match.groupdict()
-                data['referrer'] = '-'
-                data['user_agent'] = ''
-            else:
-                return None
-        else:
-            data = match.groupdict()
+    def parse_buffer(self, buffer, start: int = 0, end: Optional[int] = None):
+        """
+        Generator that parses every log line in a bytes-like buffer.
+
+        Scans the buffer with a single finditer() instead of a Python-level
+        loop over lines, and only decodes the captured fields. ``start``
+        must be at the beginning of a line.
+
+        Yields parsed entries, skipping invalid lines.
+        """
+        if end is None:
+            end = len(buffer)
+
+        finish = self._finish
+        for match in _LOG_BYTES_RE.finditer(buffer, start, end):
+            ip, timestamp, method, url, status, size, referrer, user_agent = match.group(*_FIELDS)
+            # ip, method, status and size are ASCII-only by construction
+            data = {
+                'ip': ip.decode('ascii'),
+                'timestamp': timestamp.decode('utf-8', errors='replace'),
+                'method': method.decode('ascii'),
+                'url': url.decode('utf-8', errors='replace'),
+                'status': status.decode('ascii'),
+                'size': size.decode('ascii'),
+                'referrer': referrer.decode('utf-8', errors='replace') if referrer is not None else None,
+                'user_agent': user_agent.decode('utf-8', errors='replace') if user_agent is not None else None,
+            }
+            entry = finish(data)
+            if entry is not None:
+                yield entry
+
+    def _finish(self, data: dict) -> Optional[dict]:
+        """Convert raw matched fields into a parsed entry."""
+        if data['user_agent'] is None:
+            # Common format without referrer/user-agent
+            data['referrer'] = '-'
+            data['user_agent'] = ''
+
+        # URLs and user-agents repeat heavily; interning lets every counter,
+        # session and failure record share one string (with a cached hash)
+        data['url'] = sys.intern(data['url'])
+        data['user_agent'] = sys.intern(data['user_agent'])
 
         # Parse timestamp
-        timestamp = self._parse_timestamp(data['timestamp'])
+        timestamp = self._parse_timestamp_cached(data['timestamp'])
         if timestamp is None:
             return None
         data['timestamp'] = timestamp
@@ -106,6 +218,15 @@ class LogParser:
 
     def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
         """Parse timestamp string with multiple format support."""
+        return self._parse_timestamp_cached(timestamp_str)
+
+    def _parse_timestamp_uncached(self, timestamp_str: str) -> Optional[datetime]:
+        """Run the format matching behind _parse_timestamp()."""
+        # Nearly every line uses the fixed-width common-log layout
+        timestamp = _parse_clf_timestamp(timestamp_str)
+        if timestamp is not None:
+            return timestamp
+
         for fmt in self.TIMESTAMP_FORMATS:
             try:
                 return datetime.strptime(timestamp_str, fmt)
@@ -127,13 +248,30 @@ class LogParser:
         """
         Generator that parses all lines in a file.
 
+        Reads the file in large binary blocks and parses each block with
+        parse_buffer(), so only captured fields are ever decoded.
+
         Yields parsed entries, skipping invalid lines.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                entry = self.parse(line)
-                if entry is not None:
-                    yield entry
+        with open(file_path, 'rb') as f:
+            # The file is read strictly front-to-back; let the kernel read ahead
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            pending = b''
+            while True:
+                block = f.read(self.READ_BLOCK_SIZE)
+                if not block:
+                    break
+                if pending:
+                    block = pending + block
+                # Parse up to the last complete line; carry the rest over
+                cut = max(block.rfind(b'\n'), block.rfind(b'\r')) + 1
+                pending = block[cut:]
+                yield from self.parse_buffer(block, 0, cut)
+
+            if pending:
+                yield from self.parse_buffer(pending)
 
     def parse_to_entry(self, line: str) -> Optional[LogEntry]:
         """Parse a line and return a LogEntry object."""
@@ -8,6 +8,7 @@ import os
 import sqlite3
 import secrets
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from pathlib import Path
 from datetime import datetime
@@ -16,12 +17,12 @@ from io import StringIO
 
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    session, flash, send_from_directory, abort, Response
+    session, flash, send_from_directory, abort, Response, g
 )
 import bcrypt
 
 # Import the AI bot analyzer
-from aibot import AIBotAnalyzer, get_config
+from aibot import AIBotAnalyzer
 from report_generators.html_generator import generate_html_report
 
 # Check if PostgreSQL is available
@@ -39,18 +40,34 @@ app.config['DATABASE'] = os.path.join(os.path.dirname(__file__), 'database.db')
 app.config['REPORTS_DIR'] = os.path.join(os.path.dirname(__file__), 'reports')
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+UPLOAD_COPY_BUFFER_SIZE = 1024 * 1024  # Copy uploads to disk in 1MB chunks
 ALLOWED_EXTENSIONS = {'log', 'txt'}
 
+# bcrypt work factor: each +1 doubles the cost of hashing and of every login
+# check. 12 is bcrypt's own default; tune to the deployment's CPU budget.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+# Characters not allowed in report names (\w is exactly str.isalnum() plus '_')
+REPORT_NAME_INVALID_CHARS = re.compile(r'[^\w-]')
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def sanitize_report_name(name):
+    """Lowercase a report name and replace each disallowed character with '-'."""
+    return REPORT_NAME_INVALID_CHARS.sub('-', name.lower())
+
 # Create upload folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Uploaded logs are analyzed off the request thread. Threads are enough here:
+# AIBotAnalyzer already spreads large files over worker processes itself.
+ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='analysis')
+
 # Database helpers
-def get_db():
-    """Get database connection."""
+def connect_db():
+    """Open a new database connection."""
     if USE_POSTGRES:
         # Fix Render's postgres:// URL to postgresql://
         db_url = DATABASE_URL
@@ -61,8 +78,28 @@ def get_db():
     else:
         conn = sqlite3.connect(app.config['DATABASE'])
         conn.row_factory = sqlite3.Row
+        # Per-connection setting; with WAL (see init_db) NORMAL only syncs
+        # at checkpoints instead of on every commit
+        conn.execute('PRAGMA synchronous=NORMAL')
         return conn
 
+def get_db():
+    """Get the database connection for the current app context.
+
+    The connection is opened on first use and shared by every helper in the
+    same request; close_db() closes it when the context ends.
+    """
+    if 'db' not in g:
+        g.db = connect_db()
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exception):
+    """Close the app context's database connection, if one was opened."""
+    conn = g.pop('db', None)
+    if conn is not None:
+        conn.close()
+
 def init_db():
     """Initialize the database with tables and default users."""
     conn = get_db()
@@ -96,26 +133,50 @@ def init_db():
             )
         ''')
 
+        # Create jobs table to track background report generation
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id SERIAL PRIMARY KEY,
+                client_id TEXT NOT NULL,
+                report_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+
+        # Jobs left 'processing' by a restart will never finish; a job that is
+        # in fact still running in another worker overwrites this when done
+        cursor.execute(
+            'UPDATE jobs SET status = %s, message = %s, finished_at = CURRENT_TIMESTAMP WHERE status = %s',
+            ('failed', 'Interrupted by a server restart', 'processing')
+        )
+
         # Check if demo user exists
         cursor.execute('SELECT id FROM users WHERE username = %s', ('demo',))
         if not cursor.fetchone():
-            demo_hash = bcrypt.hashpw('demo123'.encode('utf-8'), bcrypt.gensalt())
+            demo_hash = hash_password('demo123')
             cursor.execute(
                 'INSERT INTO users (username, password_hash, client_id, is_admin) VALUES (%s, %s, %s, %s)',
-                ('demo', demo_hash.decode('utf-8'), 'demo-client', 0)
+                ('demo', demo_hash, 'demo-client', 0)
             )
             print("Created demo user: demo / demo123")
 
         # Check if admin user exists
         cursor.execute('SELECT id FROM users WHERE username = %s', ('admin',))
         if not cursor.fetchone():
-            admin_hash = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt())
+            admin_hash = hash_password('admin123')
             cursor.execute(
                 'INSERT INTO users (username, password_hash, client_id, is_admin) VALUES (%s, %s, %s, %s)',
-                ('admin', admin_hash.decode('utf-8'), None, 1)
+                ('admin', admin_hash, None, 1)
             )
             print("Created admin user: admin / admin123")
     else:
+        # WAL lets dashboard reads proceed during writes and makes commits
+        # cheaper. The mode is stored in the database file, so set it once here.
+        cursor.execute('PRAGMA journal_mode=WAL')
+
         # SQLite syntax
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -142,6 +203,19 @@ def init_db():
             )
         ''')
 
+        # Create jobs table to track background report generation
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_id TEXT NOT NULL,
+                report_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+
         # Add last_login column if it doesn't exist (for existing databases)
         try:
             cursor.execute('ALTER TABLE users ADD COLUMN last_login TIMESTAMP')
@@ -154,28 +228,34 @@ def init_db():
         except sqlite3.OperationalError:
             pass  # Column already exists
 
+        # Jobs left 'processing' by a restart will never finish; a job that is
+        # in fact still running in another worker overwrites this when done
+        cursor.execute(
+            'UPDATE jobs SET status = ?, message = ?, finished_at = CURRENT_TIMESTAMP WHERE status = ?',
+            ('failed', 'Interrupted by a server restart', 'processing')
+        )
+
         # Check if demo user exists
         cursor.execute('SELECT id FROM users WHERE username = ?', ('demo',))
         if not cursor.fetchone():
-            demo_hash = bcrypt.hashpw('demo123'.encode('utf-8'), bcrypt.gensalt())
+            demo_hash = hash_password('demo123')
             cursor.execute(
                 'INSERT INTO users (username, password_hash, client_id, is_admin) VALUES (?, ?, ?, ?)',
-                ('demo', demo_hash.decode('utf-8'), 'demo-client', 0)
+                ('demo', demo_hash, 'demo-client', 0)
             )
             print("Created demo user: demo / demo123")
 
         # Check if admin user exists
         cursor.execute('SELECT id FROM users WHERE username = ?', ('admin',))
         if not cursor.fetchone():
-            admin_hash = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt())
+            admin_hash = hash_password('admin123')
             cursor.execute(
                 'INSERT INTO users (username, password_hash, client_id, is_admin) VALUES (?, ?, ?, ?)',
-                ('admin', admin_hash.decode('utf-8'), None, 1)
+                ('admin', admin_hash, None, 1)
             )
             print("Created admin user: admin / admin123")
 
     conn.commit()
-    conn.close()
 
 def get_user(username):
     """Get user by username."""
@@ -191,7 +271,6 @@ def get_user(username):
     else:
         cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
         user = cursor.fetchone()
-    conn.close()
     return user
 
 def get_all_clients():
@@ -204,39 +283,54 @@ def get_all_clients():
     if USE_POSTGRES:
         columns = [desc[0] for desc in cursor.description]
         clients = [dict(zip(columns, row)) for row in clients]
-
-    conn.close()
+        # One grouped query for every client's count, instead of loading
+        # (and summarizing) each client's full report list
+        cursor.execute('SELECT client_id, COUNT(*) FROM reports GROUP BY client_id')
+        report_counts = dict(cursor.fetchall())
 
     # Add report count for each client
     clients_with_reports = []
     for client in clients:
         if USE_POSTGRES:
             client_dict = client
+            client_dict['report_count'] = report_counts.get(client_dict.get('client_id'), 0)
         else:
             client_dict = dict(client)
-        reports = get_client_reports(client_dict.get('client_id') or client.get('client_id'))
-        client_dict['report_count'] = len(reports)
+            client_dict['report_count'] = count_client_report_files(client_dict.get('client_id'))
         clients_with_reports.append(client_dict)
 
     return clients_with_reports
 
+def count_client_report_files(client_id):
+    """Count a client's report files without reading or summarizing them."""
+    if not client_id:
+        return 0
+
+    client_dir = os.path.join(app.config['REPORTS_DIR'], client_id)
+    if not os.path.exists(client_dir):
+        os.makedirs(client_dir, exist_ok=True)
+        return 0
+
+    with os.scandir(client_dir) as entries:
+        return sum(1 for entry in entries if entry.name.endswith('.html'))
+
 def create_user(username, password, client_id, is_admin=False, company_name=None):
     """Create a new user."""
     conn = get_db()
     cursor = conn.cursor()
 
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    password_hash = hash_password(password)
 
     try:
         if USE_POSTGRES:
             cursor.execute(
                 'INSERT INTO users (username, password_hash, client_id, is_admin, company_name) VALUES (%s, %s, %s, %s, %s)',
-                (username, password_hash.decode('utf-8'), client_id, 1 if is_admin else 0, company_name)
+                (username, password_hash, client_id, 1 if is_admin else 0, company_name)
             )
         else:
             cursor.execute(
                 'INSERT INTO users (username, password_hash, client_id, is_admin, company_name) VALUES (?, ?, ?, ?, ?)',
-                (username, password_hash.decode('utf-8'), client_id, 1 if is_admin else 0, company_name)
+                (username, password_hash, client_id, 1 if is_admin else 0, company_name)
             )
         conn.commit()
 
@@ -245,15 +339,21 @@ def create_user(username, password, client_id, is_admin=False, company_name=None
             client_dir = os.path.join(app.config['REPORTS_DIR'], client_id)
             os.makedirs(client_dir, exist_ok=True)
 
-        conn.close()
         return True
     except Exception as e:
-        conn.close()
+        conn.rollback()
         return False
 
+def hash_password(password):
+    """Hash a password for storage (bcrypt output is always ASCII)."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('ascii')
+
 def verify_password(stored_hash, password):
-    """Verify a password against stored hash."""
-    return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    """Verify a password against stored hash.
+
+    bcrypt.checkpw compares in constant time, so no extra comparison is needed.
+    """
+    return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('ascii'))
 
 def get_client_reports(client_id):
     """Get list of reports for a client with metadata."""
@@ -269,7 +369,6 @@ def get_client_reports(client_id):
             (client_id,)
         )
         rows = cursor.fetchall()
-        conn.close()
 
         reports = []
         for row in rows:
@@ -299,19 +398,22 @@ def get_client_reports(client_id):
             return []
 
         reports = []
-        for filename in os.listdir(client_dir):
-            if filename.endswith('.html'):
-                filepath = os.path.join(client_dir, filename)
-                modified_time = os.path.getmtime(filepath)
+        # scandir gives each entry's path and a single cached stat()
+        with os.scandir(client_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.html'):
+                    continue
+                stat = entry.stat()
+                modified_time = stat.st_mtime
                 modified_date = datetime.fromtimestamp(modified_time)
 
                 # Try to extract summary from report
-                summary = extract_report_summary(filepath)
+                summary = extract_report_summary(entry.path)
 
                 reports.append({
-                    'filename': filename,
-                    'name': filename.replace('.html', '').replace('-', ' ').title(),
-                    'size': os.path.getsize(filepath),
+                    'filename': entry.name,
+                    'name': entry.name.replace('.html', '').replace('-', ' ').title(),
+                    'size': stat.st_size,
                     'modified': modified_time,
                     'modified_date': modified_date.strftime('%Y-%m-%d'),
                     'modified_formatted': modified_date.strftime('%b %d, %Y'),
@@ -322,6 +424,140 @@ def get_client_reports(client_id):
         reports.sort(key=lambda x: x['modified'], reverse=True)
         return reports
 
+def create_job(client_id, report_name):
+    """Record a new report generation job and return its id."""
+    conn = get_db()
+    cursor = conn.cursor()
+    if USE_POSTGRES:
+        cursor.execute(
+            'INSERT INTO jobs (client_id, report_name, status) VALUES (%s, %s, %s) RETURNING id',
+            (client_id, report_name, 'processing')
+        )
+        job_id = cursor.fetchone()[0]
+    else:
+        cursor.execute(
+            'INSERT INTO jobs (client_id, report_name, status) VALUES (?, ?, ?)',
+            (client_id, report_name, 'processing')
+        )
+        job_id = cursor.lastrowid
+    conn.commit()
+    return job_id
+
+def finish_job(job_id, status, message):
+    """Mark a report generation job as done or failed."""
+    conn = get_db()
+    cursor = conn.cursor()
+    # Same database clock as the created_at default, so both columns agree
+    if USE_POSTGRES:
+        cursor.execute('UPDATE jobs SET status = %s, message = %s, finished_at = CURRENT_TIMESTAMP WHERE id = %s',
+                     (status, message, job_id))
+    else:
+        cursor.execute('UPDATE jobs SET status = ?, message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?',
+                     (status, message, job_id))
+    conn.commit()
+
+def get_recent_jobs(limit=10):
+    """Get the most recent report generation jobs, newest first."""
+    conn = get_db()
+    cursor = conn.cursor()
+    if USE_POSTGRES:
+        cursor.execute('SELECT id, client_id, report_name, status, message, created_at, finished_at '
+                     'FROM jobs ORDER BY id DESC LIMIT %s', (limit,))
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    else:
+        cursor.execute('SELECT id, client_id, report_name, status, message, created_at, finished_at '
+                     'FROM jobs ORDER BY id DESC LIMIT ?', (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+def generate_client_report(upload_path, client_id, report_filename):
+    """Analyze an uploaded log and store the HTML report for a client.
+
+    Returns None on success, or the analyzer's error message.
+    """
+    # Built on the global config, so it reuses the shared bot detector
+    analyzer = AIBotAnalyzer()
+
+    # This runs on a background thread; forking worker processes from a
+    # multi-threaded server process can deadlock, so analyze in-process.
+    report_data = analyzer.analyze_file(upload_path, ignore_homepage_redirects=True, workers=1)
+
+    if 'error' in report_data:
+        return report_data['error']
+
+    if USE_POSTGRES:
+        # Generate report to a temporary file, then store in database
+        import tempfile
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as tmp:
+            tmp_path = tmp.name
+
+        generate_html_report(report_data, tmp_path, ignore_homepage_redirects=True)
+
+        # Read the generated HTML
+        with open(tmp_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        os.remove(tmp_path)
+
+        # Store in database
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO reports (client_id, filename, content, modified_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (client_id, filename)
+            DO UPDATE SET content = EXCLUDED.content, modified_at = EXCLUDED.modified_at
+        ''', (client_id, report_filename, html_content, datetime.now()))
+        conn.commit()
+    else:
+        # Store on filesystem
+        client_reports_dir = os.path.join(app.config['REPORTS_DIR'], client_id)
+        os.makedirs(client_reports_dir, exist_ok=True)
+
+        report_path = os.path.join(client_reports_dir, report_filename)
+
+        # Generate the HTML report
+        generate_html_report(report_data, report_path, ignore_homepage_redirects=True)
+
+    return None
+
+def run_analysis_job(job_id, upload_path, client_id, report_name):
+    """Background task: generate a report, record the outcome, remove the upload."""
+    with app.app_context():
+        try:
+            error = generate_client_report(upload_path, client_id, f'{report_name}.html')
+            if error:
+                finish_job(job_id, 'failed', f'Analysis failed: {error}')
+            else:
+                finish_job(job_id, 'done', f'Report "{report_name}" generated successfully for client: {client_id}')
+        except Exception as e:
+            app.logger.exception('Report job %s failed', job_id)
+
+            # The connection itself may be what failed, so record the
+            # outcome on a fresh one
+            conn = g.pop('db', None)
+            if conn is not None:
+                try:
+                    conn.rollback()
+                    conn.close()
+                except Exception:
+                    pass
+            try:
+                finish_job(job_id, 'failed', f'Error processing file: {str(e)}')
+            except Exception:
+                app.logger.exception('Could not record failure of report job %s', job_id)
+        finally:
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+
+def log_job_exception(future):
+    """Done-callback: log anything a background job raised instead of losing it."""
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        app.logger.error('Background report job crashed', exc_info=exc)
+
 def extract_report_summary_from_content(content):
     """Extract key stats from report HTML content."""
     try:
@@ -433,7 +669,6 @@ def login():
                 cursor.execute('UPDATE users SET last_login = ? WHERE id = ?',
                              (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), user['id']))
             conn.commit()
-            conn.close()
 
             flash(f'Welcome back, {username}!', 'success')
 
@@ -510,76 +745,37 @@ def upload():
         filename = secure_filename(file.filename)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         upload_path = os.path.join(app.config['UPLOAD_FOLDER'], f'{client_id}_{timestamp}_{filename}')
-        file.save(upload_path)
-
-        try:
-            # Run the AI bot analyzer
-            config = get_config()
-            analyzer = AIBotAnalyzer(config)
-
-            report_data = analyzer.analyze_file(upload_path, ignore_homepage_redirects=True)
-
-            if 'error' in report_data:
-                flash(f'Analysis failed: {report_data["error"]}', 'error')
-                os.remove(upload_path)  # Clean up uploaded file
-                return redirect(url_for('upload'))
-
-            # Generate HTML report
-            report_name = request.form.get('report_name', '').strip()
-            if not report_name:
-                report_name = datetime.now().strftime('%B-%Y').lower()
-
-            # Sanitize report name
-            report_name = ''.join(c if c.isalnum() or c in '-_' else '-' for c in report_name.lower())
-            report_filename = f'{report_name}.html'
-
-            if USE_POSTGRES:
-                # Generate report to a temporary file, then store in database
-                import tempfile
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as tmp:
-                    tmp_path = tmp.name
-
-                generate_html_report(report_data, tmp_path, ignore_homepage_redirects=True)
-
-                # Read the generated HTML
-                with open(tmp_path, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
-
-                os.remove(tmp_path)
-
-                # Store in database
-                conn = get_db()
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO reports (client_id, filename, content, modified_at)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (client_id, filename)
-                    DO UPDATE SET content = EXCLUDED.content, modified_at = EXCLUDED.modified_at
-                ''', (client_id, report_filename, html_content, datetime.now()))
-                conn.commit()
-                conn.close()
-            else:
-                # Store on filesystem
-                client_reports_dir = os.path.join(app.config['REPORTS_DIR'], client_id)
-                os.makedirs(client_reports_dir, exist_ok=True)
+        file.save(upload_path, buffer_size=UPLOAD_COPY_BUFFER_SIZE)
 
-                report_path = os.path.join(client_reports_dir, report_filename)
+        # Report name must be read while the request is still available
+        report_name = request.form.get('report_name', '').strip()
+        if not report_name:
+            report_name = datetime.now().strftime('%B-%Y').lower()
 
-                # Generate the HTML report
-                generate_html_report(report_data, report_path, ignore_homepage_redirects=True)
-
-            # Clean up uploaded file
-            os.remove(upload_path)
-
-            flash(f'Report "{report_name}" generated successfully for client: {client_id}', 'success')
-            return redirect(url_for('admin'))
+        # Sanitize report name
+        report_name = sanitize_report_name(report_name)
 
+        job_id = None
+        try:
+            job_id = create_job(client_id, report_name)
+            future = ANALYSIS_EXECUTOR.submit(run_analysis_job, job_id, upload_path, client_id, report_name)
+            future.add_done_callback(log_job_exception)
         except Exception as e:
+            # The job row exists but nothing will ever finish it
+            if job_id is not None:
+                try:
+                    finish_job(job_id, 'failed', f'Could not start report job: {str(e)}')
+                except Exception:
+                    app.logger.exception('Could not record failure of report job %s', job_id)
             flash(f'Error processing file: {str(e)}', 'error')
             if os.path.exists(upload_path):
                 os.remove(upload_path)
             return render_template('upload.html', username=session.get('username'), clients=clients)
 
+        flash(f'Report "{report_name}" is being generated for client: {client_id}. '
+              'Its status is shown under Recent Report Jobs.', 'success')
+        return redirect(url_for('admin'))
+
     return render_template('upload.html', username=session.get('username'), clients=clients)
 
 @app.route('/view/<client_id>/<report_filename>')
@@ -606,7 +802,6 @@ def view_report(client_id, report_filename):
             (client_id, report_filename)
         )
         row = cursor.fetchone()
-        conn.close()
 
         if not row:
             abort(404)
@@ -649,7 +844,6 @@ def download_report(client_id, report_filename):
             (client_id, report_filename)
         )
         row = cursor.fetchone()
-        conn.close()
 
         if not row:
             abort(404)
@@ -707,14 +901,15 @@ def admin():
                 else:
                     cursor.execute('DELETE FROM users WHERE id = ? AND is_admin = 0', (user_id,))
                 conn.commit()
-                conn.close()
                 success = 'Client deleted successfully.'
 
     clients = get_all_clients()
+    jobs = get_recent_jobs()
 
     return render_template('admin.html',
                          username=session.get('username'),
                          clients=clients,
+                         jobs=jobs,
                          error=error,
                          success=success)
 
@@ -738,7 +933,6 @@ def admin_client_reports(client_id):
         client = cursor.fetchone()
         if client:
             client = dict(client)
-    conn.close()
 
     if not client:
         flash('Client not found.', 'error')
@@ -769,7 +963,7 @@ def rename_report():
         return redirect(url_for('admin_client_reports', client_id=client_id))
 
     # Sanitize new name
-    new_name = ''.join(c if c.isalnum() or c in '-_' else '-' for c in new_name.lower())
+    new_name = sanitize_report_name(new_name)
     new_filename = f'{new_name}.html'
 
     if USE_POSTGRES:
@@ -779,7 +973,6 @@ def rename_report():
         # Check if old report exists
         cursor.execute('SELECT id FROM reports WHERE client_id = %s AND filename = %s', (client_id, old_filename))
         if not cursor.fetchone():
-            conn.close()
             flash('Report not found.', 'error')
             return redirect(url_for('admin_client_reports', client_id=client_id))
 
@@ -787,7 +980,6 @@ def rename_report():
         if old_filename != new_filename:
             cursor.execute('SELECT id FROM reports WHERE client_id = %s AND filename = %s', (client_id, new_filename))
             if cursor.fetchone():
-                conn.close()
                 flash('A report with that name already exists.', 'error')
                 return redirect(url_for('admin_client_reports', client_id=client_id))
 
@@ -797,9 +989,8 @@ def rename_report():
             conn.commit()
             flash(f'Report renamed to "{new_name}" successfully.', 'success')
         except Exception as e:
+            conn.rollback()
             flash(f'Error renaming report: {str(e)}', 'error')
-        finally:
-            conn.close()
     else:
         old_path = os.path.join(app.config['REPORTS_DIR'], client_id, old_filename)
         new_path = os.path.join(app.config['REPORTS_DIR'], client_id, new_filename)
@@ -842,7 +1033,6 @@ def delete_report():
 
         cursor.execute('SELECT id FROM reports WHERE client_id = %s AND filename = %s', (client_id, filename))
         if not cursor.fetchone():
-            conn.close()
             flash('Report not found.', 'error')
             return redirect(url_for('admin_client_reports', client_id=client_id))
 
@@ -851,9 +1041,8 @@ def delete_report():
             conn.commit()
             flash('Report deleted successfully.', 'success')
         except Exception as e:
+            conn.rollback()
             flash(f'Error deleting report: {str(e)}', 'error')
-        finally:
-            conn.close()
     else:
         report_path = os.path.join(app.config['REPORTS_DIR'], client_id, filename)
 